@@ -1,6 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from app.core.supabase import get_supabase, get_supabase_service_role
 from app.core.config import settings
+from app.services.embedder import embedding_cache
+from app.services.scoring_profiles import profile_cache_stats
+from app.services.bm25_index import job_index
+from app.services.score_cache import score_cache
+from app.services.feed_store import feed_staleness
+from app.core.groq_client import llm_cache_stats, llm_governor_stats
 from typing import Optional
 
 router = APIRouter()
@@ -75,3 +81,30 @@ async def list_users(sb = Depends(verify_admin_access)):
         return profiles.data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(sb = Depends(verify_admin_access)):
+    """Expose hit/miss/eviction counters for the in-process caches."""
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        **profile_cache_stats(),
+        "bm25_job_index": job_index.stats(),
+        "score_cache": score_cache.stats(),
+        "llm_response_cache": llm_cache_stats(),
+    }
+
+
+@router.get("/llm-governor")
+async def get_llm_governor(sb = Depends(verify_admin_access)):
+    """Upstream LLM admission metrics: token budget, in-flight calls, queue wait and latency percentiles."""
+    return llm_governor_stats()
+
+
+@router.get("/feed-staleness")
+async def get_feed_staleness(sb = Depends(verify_admin_access)):
+    """How old the materialized personalized feeds are."""
+    try:
+        return feed_staleness(sb)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
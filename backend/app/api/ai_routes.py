@@ -1,11 +1,15 @@
 from fastapi import APIRouter, Header, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Optional, List, Literal, Tuple
 from app.core.supabase import get_supabase
-from app.core.groq_client import chat_completion
+from app.core.groq_client import chat_completion, chat_completion_stream
 from app.core.dependencies import get_current_user
 import os
 from app.core.config import settings
+from app.core.sse import SSE_HEADERS, sse_event
+from app.services.prompt_builder import Prompt, PromptBuilder
+from app.services.resume_digest import format_digest_profile, resume_digest
 
 router = APIRouter()
 
@@ -34,10 +38,8 @@ class RoadmapSchema(BaseModel):
     items: List[RoadmapItem] = Field(description="The sequential list of milestones and skills to learn")
 
 
-@router.post("/roadmap")
-async def generate_roadmap(req: RoadmapRequest, user_data: tuple = Depends(get_current_user)):
-    user, sb = user_data
-
+def _roadmap_prompts(req: RoadmapRequest, user, sb) -> Tuple[str, str, Prompt]:
+    """Build the roadmap prompts from the user's resume digest, analysis and optional job context. Returns (target_role, system_prompt, prompt)."""
     resume_result = sb.table("resumes").select("*").eq("user_id", user.id).execute()
     analysis_result = sb.table("resume_analysis").select("*").eq("user_id", user.id).execute()
 
@@ -46,10 +48,12 @@ async def generate_roadmap(req: RoadmapRequest, user_data: tuple = Depends(get_c
 
     resume = resume_result.data[0]
     analysis = analysis_result.data[0] if analysis_result.data else {}
+    digest = resume_digest(resume)
 
     target_role = req.target_role or f"Senior {resume.get('industry', 'Tech')} Professional"
 
-    job_context_text = ""
+    job = None
+    feedback = []
     if req.job_id:
         app_res = sb.table("applications").select("ai_feedback").eq("user_id", user.id).eq("job_id", req.job_id).execute()
         job_res = sb.table("jobs").select("title, requirements").eq("id", req.job_id).execute()
@@ -57,17 +61,8 @@ async def generate_roadmap(req: RoadmapRequest, user_data: tuple = Depends(get_c
         if job_res.data:
             job = job_res.data[0]
             target_role = job.get("title", target_role)
-            feedback = []
             if app_res.data and app_res.data[0].get("ai_feedback"):
                 feedback = app_res.data[0]["ai_feedback"]
-            
-            job_context_text = f"\n\nCRUCIAL CONTEXT - SPECIFIC ROLE:\nThe candidate recently filed an application for the role of '{target_role}'.\n"
-            if feedback:
-                job_context_text += f"\nAn expert AI Hiring Coach reviewed their application for this specific role and gave the following critical feedback tips to improve:\n"
-                for i, tip in enumerate(feedback):
-                    job_context_text += f"{i+1}. {tip}\n"
-                
-            job_context_text += f"\nYour EXCLUSIVE mission is to build a roadmap that directly addresses these exact feedback points and prepares them for this specific role requirements: {job.get('requirements', '')}."
 
     system_prompt = f"""You are a world-class career coach and tech educator. Generate a detailed, actionable career roadmap for this professional.
 IMPORTANT: Return strictly valid JSON conforming exactly to the requested schema. No markdown wrapping.
@@ -78,56 +73,105 @@ For paid courses, refer to Coursera or Udemy direct searches.
 Return ONLY a JSON object that strictly adheres to the schema representing {RoadmapSchema.__name__}.
 """
 
-    user_prompt = f"""Candidate Profile:
-- Current Skills: {', '.join(resume.get('skills', [])[:15])}
-- Experience: {resume.get('experience_years', 0)} years
-- Education: {resume.get('education_level', 'bachelors')}
-- Industry: {resume.get('industry', 'technology')}
-- Seniority: {resume.get('seniority', 'junior')}
-- Target Role: {target_role}
-- Missing Skills Identified: {', '.join(analysis.get('missing_skills', [])[:8])}
-- Current Weaknesses: {', '.join(analysis.get('weaknesses', [])[:3])}{job_context_text}
-
+    builder = PromptBuilder("roadmap", system_prompt) \
+        .add("Candidate Profile:\n" + format_digest_profile(digest, max_skills=15)) \
+        .add(f"- Target Role: {target_role}") \
+        .add(f"- Missing Skills Identified: {', '.join(analysis.get('missing_skills', [])[:8])}", priority=3) \
+        .add(f"- Current Weaknesses: {', '.join(analysis.get('weaknesses', [])[:3])}", priority=3)
+
+    if job:
+        builder.add(f"\nCRUCIAL CONTEXT - SPECIFIC ROLE:\nThe candidate recently filed an application for the role of '{target_role}'.")
+        if feedback:
+            builder.add(
+                "An expert AI Hiring Coach reviewed their application for this specific role and gave the following critical feedback tips to improve:\n"
+                + "\n".join(f"{i+1}. {tip}" for i, tip in enumerate(feedback)),
+                priority=2,
+            )
+        builder.add(f"Your EXCLUSIVE mission is to build a roadmap that directly addresses these exact feedback points and prepares them for this specific role requirements: {job.get('requirements', '')}.", priority=1)
+
+    builder.add("""
 Generate a personalized 5-7 milestone roadmap to help this candidate reach the target role and overcome their weaknesses.
-FORMAT REQUEST: Return RAW JSON ONLY."""
+FORMAT REQUEST: Return RAW JSON ONLY.""")
+
+    return target_role, system_prompt, builder.build()
+
+
+def _save_roadmap(sb, user, target_role: str, ai_response: str, usage: dict, endpoint: str, prompt: Prompt) -> dict:
+    """Validate the model output against RoadmapSchema, store it and log token usage. Raises if the output is not a valid roadmap."""
+    start = ai_response.find("{")
+    end = ai_response.rfind("}") + 1
+    json_str = ai_response[start:end]
+
+    parsed_roadmap = RoadmapSchema.model_validate_json(json_str)
+    roadmap_dict = parsed_roadmap.model_dump()
+
+    roadmap_data = {
+        "user_id": user.id,
+        "target_role": roadmap_dict.get("target_role", target_role),
+        "total_duration": roadmap_dict.get("total_duration", "3 months"),
+        "ai_narrative": roadmap_dict.get("ai_narrative", ""),
+        "items": roadmap_dict.get("items", []),
+    }
+
+    sb.table("roadmaps").insert(roadmap_data).execute()
+
+    # Log Token Usage
+    sb.table("token_usage_logs").insert({
+        "user_id": user.id,
+        "endpoint": endpoint,
+        "input_tokens": usage["prompt_tokens"],
+        "output_tokens": usage["completion_tokens"],
+        "total_tokens": usage["total_tokens"],
+        "prompt_tokens_saved": prompt.tokens_saved,
+    }).execute()
+
+    return roadmap_dict
+
+
+@router.post("/roadmap")
+async def generate_roadmap(req: RoadmapRequest, user_data: tuple = Depends(get_current_user)):
+    user, sb = user_data
+    target_role, system_prompt, prompt = _roadmap_prompts(req, user, sb)
 
     try:
-        # Use simple raw chat completion, but use Pydantic to strictly parse and dump the response
-        ai_response, usage = await chat_completion(system_prompt, user_prompt, max_tokens=2500)
-        
-        start = ai_response.find("{")
-        end = ai_response.rfind("}") + 1
-        json_str = ai_response[start:end]
-        
-        parsed_roadmap = RoadmapSchema.model_validate_json(json_str)
-        roadmap_dict = parsed_roadmap.model_dump()
-        
-        roadmap_data = {
-            "user_id": user.id,
-            "target_role": roadmap_dict.get("target_role", target_role),
-            "total_duration": roadmap_dict.get("total_duration", "3 months"),
-            "ai_narrative": roadmap_dict.get("ai_narrative", ""),
-            "items": roadmap_dict.get("items", []),
-        }
-
-        sb.table("roadmaps").insert(roadmap_data).execute()
-        
-        # Log Token Usage
-        sb.table("token_usage_logs").insert({
-            "user_id": user.id,
-            "endpoint": "/api/ai/roadmap",
-            "input_tokens": usage["prompt_tokens"],
-            "output_tokens": usage["completion_tokens"],
-            "total_tokens": usage["total_tokens"]
-        }).execute()
-
-        return roadmap_dict
-        
+        # Use simple raw chat completion, but use Pydantic to strictly parse and dump the response.
+        # Every request stores a new roadmap and logs its usage, so it always asks the model.
+        ai_response, usage = await chat_completion(system_prompt, prompt.text, max_tokens=2500, bypass_cache=True)
+        return _save_roadmap(sb, user, target_role, ai_response, usage, "/api/ai/roadmap", prompt)
+
     except Exception as e:
         print(f"Error generating roadmap dynamically: {e}")
         raise HTTPException(status_code=500, detail="Failed to synthesize roadmap dynamically.")
 
 
+@router.post("/roadmap/stream")
+async def stream_roadmap(req: RoadmapRequest, user_data: tuple = Depends(get_current_user)):
+    """
+    Same as POST /roadmap, streamed as Server-Sent Events so the client can render while the model writes.
+    Emits `token` events ({"text": delta}) followed by one `done` event carrying the validated roadmap,
+    or an `error` event if the output could not be validated. The roadmap is stored only when the
+    stream completes.
+    """
+    user, sb = user_data
+    target_role, system_prompt, prompt = _roadmap_prompts(req, user, sb)
+
+    async def events():
+        usage: dict = {}
+        parts = []
+        try:
+            # Never served from the response cache: each stream stores a new roadmap, as POST /roadmap does
+            async for delta in chat_completion_stream(system_prompt, prompt.text, max_tokens=2500, usage=usage, bypass_cache=True):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+            roadmap_dict = _save_roadmap(sb, user, target_role, "".join(parts), usage, "/api/ai/roadmap/stream", prompt)
+        except Exception as e:
+            print(f"Error streaming roadmap: {e}")
+            yield sse_event("error", {"detail": "Failed to synthesize roadmap dynamically."})
+            return
+        yield sse_event("done", roadmap_dict)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 
 @router.get("/roadmap")
 async def get_roadmap(user_data: tuple = Depends(get_current_user)):
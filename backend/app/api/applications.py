@@ -1,11 +1,11 @@
-import json
-from fastapi import APIRouter, Header, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, Header, HTTPException, Depends
+from postgrest.exceptions import APIError
 from pydantic import BaseModel
 from typing import Optional
 from app.core.supabase import get_supabase
-from app.services.scorer import compute_compatibility_score
+from app.services.scorer import score_pair
 from app.core.dependencies import get_current_user
-from app.core.groq_client import chat_completion
+from app.services.application_feedback import generate_application_feedback
 
 router = APIRouter()
 
@@ -18,14 +18,9 @@ class ApplicationCreate(BaseModel):
 
 
 @router.post("")
-async def apply_to_job(req: ApplicationCreate, user_data: tuple = Depends(get_current_user)):
+async def apply_to_job(req: ApplicationCreate, background_tasks: BackgroundTasks, user_data: tuple = Depends(get_current_user)):
     user, sb = user_data
 
-    # Check for duplicate application
-    existing = sb.table("applications").select("id").eq("user_id", user.id).eq("job_id", req.job_id).execute()
-    if existing.data:
-        raise HTTPException(status_code=400, detail="You have already applied to this job")
-
     # Fetch Job Details
     job_res = sb.table("jobs").select("*").eq("id", req.job_id).execute()
     if not job_res.data:
@@ -39,65 +34,59 @@ async def apply_to_job(req: ApplicationCreate, user_data: tuple = Depends(get_cu
     if resume_res.data:
         resume = resume_res.data[0]
         try:
-            scores = compute_compatibility_score(
-                user_skills=resume.get("skills", []) or [],
-                user_experience_years=resume.get("experience_years", 0) or 0,
-                user_education=resume.get("education_level", "other") or "other",
-                user_industry=resume.get("industry", "other") or "other",
-                resume_embedding=resume.get("embedding", []) or [],
-                
-                job_skills=job.get("skills_required", []) or [],
-                job_experience_min=job.get("experience_min", 0) or 0,
-                job_experience_max=job.get("experience_max", 10) or 10,
-                job_education=job.get("education_level", "bachelors") or "bachelors",
-                job_industry=job.get("industry", "other") or "other",
-                job_description=job.get("description", "") or "",
-                resume_text=resume.get("raw_text", "") or "",
-                job_embedding=[]  # Job embedding not yet implemented
-            )
+            scores = score_pair(resume, job)
             match_score = scores["total_score"]
         except Exception as e:
             print(f"Scoring failed: {e}")
             match_score = 0
 
-    ai_feedback = []
-    if resume_res.data:
-        try:
-            prompt = f"""
-            You are an expert tech recruiter and career coach. Review this applicant's resume against the Job Description.
-            Return EXACTLY a JSON array of 3 concise, highly actionable sentences explaining how the applicant could improve their resume, cover letter, or interview strategy for THIS specific role.
-            Do not include any other text, markdown blocks, or conversational filler. Only the strict JSON array of 3 strings.
-
-            Job Requirements: {job.get('requirements', '')}
-            Job Description: {job.get('description', '')}
-            Applicant Resume Text: {resume.get('raw_text', '')}
-            """
-            content, _ = await chat_completion(
-                system_prompt="You are a strict JSON-producing Career Coach assistant.",
-                user_prompt=prompt,
-                max_tokens=300
-            )
-            parsed = json.loads(content)
-            if isinstance(parsed, list):
-                ai_feedback = parsed[:3]
-        except Exception as e:
-            print(f"Feedback generation failed: {e}")
-
-    result = sb.table("applications").insert({
-        "user_id": user.id,
-        "job_id": req.job_id,
-        "cover_letter": req.cover_letter,
-        "contact_email": req.contact_email,
-        "contact_phone": req.contact_phone,
-        "status": "applied",
-        "match_score": match_score,
-        "ai_feedback": ai_feedback
-    }).execute()
+    # Feedback is generated after the response; the row records that it is owed
+    feedback_status = "pending" if resume_res.data else "ready"
+    try:
+        result = sb.table("applications").insert({
+            "user_id": user.id,
+            "job_id": req.job_id,
+            "cover_letter": req.cover_letter,
+            "contact_email": req.contact_email,
+            "contact_phone": req.contact_phone,
+            "status": "applied",
+            "match_score": match_score,
+            "ai_feedback": [],
+            "ai_feedback_status": feedback_status,
+        }).execute()
+    except APIError as e:
+        # UNIQUE(user_id, job_id) rejects a second application, no need to check first
+        if e.code == "23505":
+            raise HTTPException(status_code=400, detail="You have already applied to this job")
+        raise
+    application_id = result.data[0]["id"] if result.data else None
+
+    if application_id and feedback_status == "pending":
+        background_tasks.add_task(generate_application_feedback, sb, application_id)
 
     return {
         "message": "Application submitted successfully", 
-        "id": result.data[0]["id"] if result.data else None,
-        "ai_feedback": ai_feedback
+        "id": application_id,
+        "ai_feedback": [],
+        "ai_feedback_status": feedback_status,
+    }
+
+
+@router.get("/{application_id}/feedback")
+async def get_application_feedback(application_id: str, user_data: tuple = Depends(get_current_user)):
+    """Poll for the AI feedback on an application: status is pending until it has been generated."""
+    user, sb = user_data
+
+    result = sb.table("applications").select("id, ai_feedback, ai_feedback_status") \
+        .eq("id", application_id).eq("user_id", user.id).execute()
+    if not result.data:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    application = result.data[0]
+    return {
+        "id": application["id"],
+        "ai_feedback_status": application.get("ai_feedback_status") or "ready",
+        "ai_feedback": application.get("ai_feedback") or [],
     }
 
 
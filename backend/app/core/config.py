@@ -9,6 +9,46 @@ class Settings(BaseSettings):
     ADMIN_SECRET_KEY: str | None = None
     SUPABASE_SERVICE_ROLE_KEY: str | None = None
     GROQ_MODEL: str = "llama-3.1-8b-instant"
+    LLM_PROVIDER: str = "groq"  # "groq", or "fake" for offline load tests and benchmarks
+    FAKE_LLM_TTFT_MS: float = 300.0  # median time to first token
+    FAKE_LLM_LATENCY_SIGMA: float = 0.5  # log-normal spread of the time to first token
+    FAKE_LLM_TOKENS_PER_SECOND: float = 500.0
+    FAKE_LLM_COMPLETION_TOKENS: int | None = None  # fixed completion size; default: estimated from the response
+    FAKE_LLM_ERROR_RATE: float = 0.0  # fraction of calls that fail with 429
+    FAKE_LLM_SEED: int | None = None
+    LLM_CACHE_SIZE: int = 1000
+    LLM_CACHE_TTL_SECONDS: float = 24 * 3600.0
+    LLM_TOKENS_PER_MINUTE: int = 30000  # set to the Groq plan's TPM quota for GROQ_MODEL
+    LLM_MAX_IN_FLIGHT: int = 8
+    LLM_MAX_RETRIES: int = 4
+    LLM_BACKOFF_BASE_SECONDS: float = 0.5
+    LLM_BACKOFF_MAX_SECONDS: float = 20.0
+    CPU_EXECUTOR: str = "thread"  # "thread" or "process"
+    CPU_EXECUTOR_WORKERS: int = 4
+    CPU_EXECUTOR_MAX_PENDING: int = 32
+    CPU_TASK_TIMEOUT_SECONDS: float = 30.0
+    RESUME_MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+    RESUME_MAX_PAGES: int = 30
+    RESUME_MAX_CHARS: int = 10000
+    RESUME_PARSE_WORKERS: int = 1
+    RESUME_PARALLEL_MIN_PAGES: int = 8
+    EMBED_WARMUP: bool = True
+    EMBED_BATCH_SIZE: int = 32
+    EMBED_BATCH_WAIT_MS: float = 5.0
+    EMBED_CACHE_SIZE: int = 2048
+    EMBED_CACHE_PATH: str | None = ".cache/embeddings.sqlite3"
+    EMBED_CACHE_DISK_MAX_ENTRIES: int = 100000
+    SKILLS_TAXONOMY_PATH: str | None = None
+    SKILLS_TAXONOMY_RELOAD_SECONDS: float = 5.0
+    JOB_INDEX_SYNC_SECONDS: float = 60.0  # how often each worker re-reads edited/closed jobs into its BM25 index
+    SCORE_CACHE_SIZE: int = 20000
+    SCORE_CACHE_TTL_SECONDS: float = 900.0
+    FEED_MAX_AGE_SECONDS: float = 3600.0
+    FEED_CANDIDATE_POOL: int = 200
+    FEED_RERANK_BUDGET_MS: float = 250.0
+    JOBS_RANK_POOL: int = 200  # newest matching jobs ranked for a signed-in user's job search
+    APPLICATION_FEEDBACK_LEASE_SECONDS: float = 120.0
+    APPLICATION_FEEDBACK_SWEEP_SECONDS: float = 60.0
 
     class Config:
         env_file = ".env"
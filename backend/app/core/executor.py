@@ -0,0 +1,59 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from fastapi import HTTPException
+from app.core.config import settings
+
+_executor: Executor | None = None
+_slots: threading.BoundedSemaphore | None = None
+_init_lock = threading.Lock()
+
+
+def get_executor() -> Executor:
+    """Shared pool for CPU-bound service calls (parsing, extraction). Kind and size come from settings."""
+    global _executor, _slots
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                workers = max(1, settings.CPU_EXECUTOR_WORKERS)
+                if settings.CPU_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+                _slots = threading.BoundedSemaphore(workers + max(0, settings.CPU_EXECUTOR_MAX_PENDING))
+    return _executor
+
+
+async def run_cpu(func: Callable[..., Any], *args, timeout: float | None = None, **kwargs) -> Any:
+    """
+    Run a blocking function on the CPU executor without stalling the event loop.
+    Raises 503 when the queue is full and 504 when the call exceeds its timeout.
+    With the process executor `func` and its arguments must be picklable.
+    """
+    executor = get_executor()
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Server is busy processing other files, please retry shortly")
+
+    try:
+        future = executor.submit(functools.partial(func, *args, **kwargs))
+    except Exception:
+        _slots.release()
+        raise
+    # Release the slot when the work actually finishes, even if the caller timed out
+    future.add_done_callback(lambda _: _slots.release())
+
+    timeout = settings.CPU_TASK_TIMEOUT_SECONDS if timeout is None else timeout
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+    except asyncio.TimeoutError:
+        future.cancel()
+        raise HTTPException(status_code=504, detail="Processing took too long, please try a smaller file")
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,32 +1,161 @@
-from groq import AsyncGroq
+import hashlib
+from app.core.cache import LRUCache
 from app.core.config import settings
-from typing import Tuple, Dict
-
-_groq_client: AsyncGroq | None = None
-
-
-def get_groq() -> AsyncGroq:
-    global _groq_client
-    if _groq_client is None:
-        _groq_client = AsyncGroq(api_key=settings.GROQ_API_KEY)
-    return _groq_client
-
-
-async def chat_completion(system_prompt: str, user_prompt: str, max_tokens: int = 2048) -> Tuple[str, Dict[str, int]]:
-    client = get_groq()
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        max_tokens=max_tokens,
-        temperature=0.7,
-    )
-    content = response.choices[0].message.content or ""
-    usage = {
-        "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
-        "completion_tokens": response.usage.completion_tokens if response.usage else 0,
-        "total_tokens": response.usage.total_tokens if response.usage else 0
-    }
-    return content, usage
+from app.core.llm_governor import LLMGovernor
+from app.core.llm_providers import LLMProvider, create_provider
+from app.core.tokens import estimate_tokens
+from typing import Any, AsyncIterator, Callable, Tuple, Dict, Optional
+
+_provider: LLMProvider | None = None
+_governor: LLMGovernor | None = None
+
+# Completed responses, keyed by model + prompt (or a caller-supplied key)
+_response_cache = LRUCache(max_size=settings.LLM_CACHE_SIZE, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
+_tokens_saved = 0
+
+
+def get_provider() -> LLMProvider:
+    """The LLM backend (Groq, or the offline fake with LLM_PROVIDER=fake)."""
+    global _provider
+    if _provider is None:
+        _provider = create_provider()
+    return _provider
+
+
+def get_governor() -> LLMGovernor:
+    global _governor
+    if _governor is None:
+        _governor = LLMGovernor(
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base_seconds=settings.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.LLM_BACKOFF_MAX_SECONDS,
+        )
+    return _governor
+
+
+def _no_usage() -> Dict[str, int]:
+    return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def _response_key(system_prompt: str, user_prompt: str, max_tokens: int, cache_key: Optional[str]) -> str:
+    if cache_key is not None:
+        parts = [get_provider().model, "key", cache_key, str(max_tokens)]
+    else:
+        parts = [get_provider().model, "prompt", system_prompt, user_prompt, str(max_tokens)]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def _cache_if_valid(key: str, content: str, usage: Dict[str, int], validate: Optional[Callable[[str], Any]]) -> None:
+    """Cache a response only once the caller's validator has parsed it."""
+    if not content or validate is None:
+        return
+    try:
+        validate(content)
+    except Exception:
+        return  # malformed output is retried next time instead of being served from cache
+    _response_cache.set(key, (content, dict(usage)))
+
+
+async def chat_completion(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 2048,
+    cache_key: Optional[str] = None,
+    bypass_cache: bool = False,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Run a chat completion, answering repeats from the response cache.
+
+    Responses are cached by model, prompts and max_tokens, or by `cache_key` when the
+    caller has a better identity for the answer (e.g. resume version + job version).
+    `bypass_cache` forces a fresh completion (which then replaces the cached one).
+    Only responses that `validate` (the caller's parser) accepts without raising are cached,
+    so without a validator nothing is cached.
+    Misses go through the governor (rate limit, concurrency cap, backoff), and identical
+    prompts already in flight share that call. Cache hits and shared calls report zero
+    token usage, since nothing extra was spent.
+    """
+    global _tokens_saved
+    key = _response_key(system_prompt, user_prompt, max_tokens, cache_key)
+    if not bypass_cache:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            content, usage = cached
+            _tokens_saved += usage["total_tokens"]
+            return content, _no_usage()
+
+    governor = get_governor()
+    cost = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+
+    async def call() -> Tuple[str, Dict[str, int]]:
+        content, usage = await get_provider().complete(system_prompt, user_prompt, max_tokens)
+        _cache_if_valid(key, content, usage, validate)
+        governor.settle(cost, usage["total_tokens"] or cost)  # last, so a failure is refunded exactly once
+        return content, usage
+
+    (content, usage), coalesced = await governor.run(call, cost, key=None if bypass_cache else key)
+    return content, _no_usage() if coalesced else usage
+
+
+async def chat_completion_stream(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int = 2048,
+    usage: Optional[Dict[str, int]] = None,
+    cache_key: Optional[str] = None,
+    bypass_cache: bool = False,
+    validate: Optional[Callable[[str], Any]] = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of chat_completion: yields content deltas as the model produces them.
+
+    Pass a `usage` dict to receive the token counts; it is filled in once the stream ends.
+    Shares the response cache with chat_completion: a hit is yielded as a single chunk, and a
+    stream that runs to completion is cached if `validate` accepts it. A stream abandoned mid-way (client disconnect)
+    closes the upstream request and caches nothing.
+    """
+    global _tokens_saved
+    if usage is None:
+        usage = {}
+    usage.update(_no_usage())
+    key = _response_key(system_prompt, user_prompt, max_tokens, cache_key)
+    if not bypass_cache:
+        cached = _response_cache.get(key)
+        if cached is not None:
+            content, cached_usage = cached
+            _tokens_saved += cached_usage["total_tokens"]
+            yield content
+            return
+
+    governor = get_governor()
+    cost = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+    # The slot is held for the whole stream, not just until the first chunk
+    async with governor.slot(cost):
+        try:
+            deltas = await governor.with_retries(
+                lambda: get_provider().open_stream(system_prompt, user_prompt, max_tokens, usage)
+            )
+        except BaseException:
+            governor.settle(cost, 0)  # the stream never opened: nothing was spent
+            raise
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield delta
+        finally:
+            await deltas.aclose()
+            governor.settle(cost, usage["total_tokens"] or cost)
+
+    _cache_if_valid(key, "".join(parts), usage, validate)
+
+
+def llm_cache_stats() -> Dict[str, int]:
+    return {**_response_cache.stats(), "tokens_saved": _tokens_saved}
+
+
+def llm_governor_stats() -> Dict[str, Any]:
+    return {"provider": get_provider().name, **get_governor().stats()}
@@ -0,0 +1,187 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from groq import APIConnectionError
+
+# Timeout, conflict, rate limited, and the server errors the SDK itself would have retried
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+# Requests that never got a response (APITimeoutError is an APIConnectionError)
+RETRYABLE_ERRORS = (APIConnectionError, ConnectionError, asyncio.TimeoutError)
+LATENCY_WINDOW = 1000  # recent calls kept for the queue-wait / latency percentiles
+
+
+def _percentiles(samples) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "max_ms": round(ordered[-1], 1),
+    }
+
+
+class LLMGovernor:
+    """
+    Admission control for upstream LLM calls:
+
+    - a token bucket refilled at the tokens-per-minute quota; each call reserves its estimated
+      cost (prompt estimate + max_tokens) and the difference is refunded once the real usage is known,
+      or all of it when the call fails
+    - a semaphore capping the calls in flight
+    - retries of rate-limited, failed (5xx) and dropped (connection/timeout) calls with jittered
+      exponential backoff (honouring Retry-After); a 429 also drains the bucket so every other caller backs off too
+    - single-flight: callers passing the same key while a call is in flight share its result
+
+    Waiters queue in arrival order, so large requests are not starved by small ones.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        max_in_flight: int,
+        max_retries: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 20.0,
+    ):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base_seconds
+        self.backoff_max = backoff_max_seconds
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+        self._bucket_lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._queue_wait_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self._upstream_ms: deque = deque(maxlen=LATENCY_WINDOW)
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+        self.waiting = 0
+        self.active = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def _take_tokens(self, cost: float):
+        cost = min(cost, self.capacity)  # a single oversized call must still be admissible
+        async with self._bucket_lock:
+            while True:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+
+    def settle(self, reserved: int, used: int):
+        """Refund the part of a reservation the call did not use (or charge the overrun)."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + min(reserved, self.capacity) - used)
+
+    @asynccontextmanager
+    async def slot(self, cost: int):
+        """Wait for budget and a free slot, and hold the slot for the body (e.g. a whole stream)."""
+        self.requests += 1
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await self._take_tokens(cost)
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self._queue_wait_ms.append((time.monotonic() - started) * 1000)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            floor = float(retry_after) if retry_after else 0.0
+        except ValueError:
+            floor = 0.0
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return max(floor, random.uniform(delay / 2, delay))
+
+    async def with_retries(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one upstream call, retrying rate limits, server errors and connection failures with backoff."""
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            self.upstream_calls += 1
+            try:
+                result = await call()
+            except Exception as e:
+                # Provider errors carry the HTTP status (the Groq SDK's APIStatusError, the fake provider's error)
+                status = getattr(e, "status_code", None)
+                retryable = status in RETRYABLE_STATUS or isinstance(e, RETRYABLE_ERRORS)
+                if not retryable or attempt >= self.max_retries:
+                    self.failures += 1
+                    raise
+                if status == 429:
+                    self.rate_limited += 1
+                    self._tokens = min(self._tokens, 0.0)
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            self._upstream_ms.append((time.monotonic() - started) * 1000)
+            return result
+
+    async def _governed(self, call: Callable[[], Awaitable[Any]], cost: int) -> Any:
+        """Run `call` in a slot. `call` settles its own reservation once it has the usage; a failed call refunds it."""
+        async with self.slot(cost):
+            try:
+                return await self.with_retries(call)
+            except BaseException:
+                self.settle(cost, 0)
+                raise
+
+    async def run(self, call: Callable[[], Awaitable[Any]], cost: int, key: Optional[str] = None) -> Tuple[Any, bool]:
+        """
+        Run `call` under the governor. Returns (result, coalesced): coalesced is True when the
+        result came from an identical call (same `key`) that was already in flight.
+        The shared call keeps running if the caller that started it goes away.
+        """
+        if key is not None and key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key]), True
+
+        task = asyncio.ensure_future(self._governed(call, cost))
+        if key is not None:
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), False
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "tokens_per_minute": int(self.capacity),
+            "tokens_available": int(self._tokens),
+            "max_in_flight": self.max_in_flight,
+            "active": self.active,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "upstream_calls": self.upstream_calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "queue_wait": _percentiles(self._queue_wait_ms),
+            "upstream_latency": _percentiles(self._upstream_ms),
+        }
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from groq import AsyncGroq
+from app.core.config import settings
+from app.core.tokens import estimate_tokens
+
+
+class LLMProvider(ABC):
+    """
+    A chat-completion backend behind chat_completion / chat_completion_stream.
+    `model` identifies the provider's output in the response cache.
+    """
+
+    name = "base"
+    model = ""
+
+    @abstractmethod
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        """One completion. Returns (content, usage)."""
+
+    @abstractmethod
+    async def open_stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """
+        Start a streamed completion and return an iterator of content deltas once the request
+        has been accepted, so rate-limit errors surface here (where they can be retried)
+        rather than mid-stream. `usage` is filled in when the stream ends.
+        """
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    def __init__(self, client: AsyncGroq, model: str):
+        self.client = client
+        self.model = model
+
+    def _messages(self, system_prompt: str, user_prompt: str) -> List[Dict[str, str]]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(system_prompt, user_prompt),
+            max_tokens=max_tokens,
+            temperature=0.7,
+        )
+        content = response.choices[0].message.content or ""
+        usage = {
+            "prompt_tokens": response.usage.prompt_tokens if response.usage else 0,
+            "completion_tokens": response.usage.completion_tokens if response.usage else 0,
+            "total_tokens": response.usage.total_tokens if response.usage else 0
+        }
+        return content, usage
+
+    async def open_stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(system_prompt, user_prompt),
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True,
+        )
+
+        async def deltas():
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    # Groq reports usage on the final chunk, under x_groq
+                    chunk_usage = getattr(getattr(chunk, "x_groq", None), "usage", None) or getattr(chunk, "usage", None)
+                    if chunk_usage:
+                        usage["prompt_tokens"] = chunk_usage.prompt_tokens or 0
+                        usage["completion_tokens"] = chunk_usage.completion_tokens or 0
+                        usage["total_tokens"] = chunk_usage.total_tokens or 0
+            finally:
+                await stream.close()
+
+        return deltas()
+
+
+class FakeProviderError(Exception):
+    """A simulated upstream failure; carries a status code like the SDK's APIStatusError."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Simulated LLM error {status_code}")
+        self.status_code = status_code
+        self.response = None
+
+
+_TARGET_ROLE = re.compile(r"Target Role:\s*(.+)")
+_MISSING_SKILLS = re.compile(r"Missing Skills(?: Identified)?:\s*(.+)")
+
+
+def _listed(pattern: re.Pattern, text: str) -> List[str]:
+    match = pattern.search(text)
+    if not match or match.group(1).strip() in ("", "None"):
+        return []
+    return [item.strip() for item in match.group(1).split(",") if item.strip()]
+
+
+def _fake_roadmap(user_prompt: str, rng: random.Random) -> dict:
+    role_match = _TARGET_ROLE.search(user_prompt)
+    target_role = role_match.group(1).strip() if role_match else "Software Engineer"
+    skills = _listed(_MISSING_SKILLS, user_prompt) or ["System Design", "Cloud Fundamentals", "Testing"]
+    items = []
+    for priority, skill in enumerate(skills[:rng.randint(5, 7)] if len(skills) >= 5 else skills, start=1):
+        query = skill.replace(" ", "+")
+        items.append({
+            "skill": skill,
+            "priority": priority,
+            "timeline": f"{rng.randint(1, 4)} weeks",
+            "resources": [
+                {"title": f"{skill} Full Course", "type": "video", "cost": "free",
+                 "url": f"https://www.youtube.com/results?search_query=Learn+{query}+Full+Course"},
+                {"title": f"{skill} on Coursera", "type": "course", "cost": "paid",
+                 "url": f"https://www.coursera.org/search?query={query}"},
+            ],
+            "milestone": f"Build and publish a small project that uses {skill}.",
+        })
+    return {
+        "target_role": target_role,
+        "total_duration": f"{rng.randint(3, 6)} months",
+        "ai_narrative": f"This plan closes the main gaps for a {target_role} role one skill at a time.",
+        "items": items,
+    }
+
+
+def _fake_resume_analysis(rng: random.Random) -> dict:
+    return {
+        "strengths": ["Clear description of recent projects", "Relevant technical skills", "Steady career progression"],
+        "weaknesses": ["Few quantified achievements", "Summary could be more targeted"],
+        "missing_skills": ["Docker", "Kubernetes", "System Design"][:rng.randint(1, 3)],
+        "keyword_optimization": rng.randint(50, 90),
+        "profile_completeness": rng.randint(50, 95),
+        "industry_alignment": "Good alignment with the candidate's target industry",
+        "ai_summary": "An experienced professional with a solid technical foundation and room to sharpen their resume.",
+    }
+
+
+def _fake_score_explanation(user_prompt: str, rng: random.Random) -> dict:
+    missing = _listed(_MISSING_SKILLS, user_prompt)
+    return {
+        "explanation": "Your background covers most of this role's core requirements. A few targeted improvements would make you a strong candidate.",
+        "tips": [f"Learn {missing[0]}" if missing else "Add a portfolio project relevant to this role",
+                 rng.choice(["Quantify your impact in recent roles", "Tailor your summary to this job"])],
+    }
+
+
+def _fake_feedback() -> list:
+    return [
+        "Lead your resume with the achievements most relevant to this role's requirements.",
+        "Mention the specific technologies from the job description that you have used in production.",
+        "Prepare a concise story about a project that shows the impact this team is looking for.",
+    ]
+
+
+def fake_response(system_prompt: str, user_prompt: str) -> str:
+    """
+    A schema-valid response for each prompt type the app sends, recognised by the format each
+    prompt asks for. Deterministic: the same prompts always produce the same output.
+    """
+    rng = random.Random(hashlib.sha256((system_prompt + "\x00" + user_prompt).encode("utf-8")).digest())
+    if "RoadmapSchema" in system_prompt:
+        return json.dumps(_fake_roadmap(user_prompt, rng))
+    if '"strengths"' in system_prompt:
+        return json.dumps(_fake_resume_analysis(rng))
+    if '"explanation"' in system_prompt:
+        return json.dumps(_fake_score_explanation(user_prompt, rng))
+    if "JSON array" in user_prompt:
+        return json.dumps(_fake_feedback())
+    return "This is a simulated response."
+
+
+class FakeProvider(LLMProvider):
+    """
+    Offline stand-in for load tests and benchmarks (LLM_PROVIDER=fake): no network, realistic timing.
+
+    Time to first token is log-normal around `ttft_ms`, generation runs at `tokens_per_second`,
+    and a fraction `error_rate` of calls fail with a 429 so the governor's backoff is exercised.
+    Completion token counts are estimated from the content unless `completion_tokens` fixes them.
+    """
+
+    name = "fake"
+    model = "fake"
+
+    def __init__(
+        self,
+        ttft_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 500.0,
+        completion_tokens: Optional[int] = None,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.ttft_ms = ttft_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+    def _ttft_seconds(self) -> float:
+        return self.ttft_ms / 1000 * self._rng.lognormvariate(0.0, self.latency_sigma)
+
+    def _respond(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        content = fake_response(system_prompt, user_prompt)
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+        completion_tokens = min(max_tokens, self.completion_tokens or estimate_tokens(content))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        return content, usage
+
+    async def _maybe_fail(self, ttft: float):
+        if self._rng.random() < self.error_rate:
+            await asyncio.sleep(ttft / 4)
+            raise FakeProviderError(429)
+
+    async def complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Tuple[str, Dict[str, int]]:
+        ttft = self._ttft_seconds()
+        await self._maybe_fail(ttft)
+        content, usage = self._respond(system_prompt, user_prompt, max_tokens)
+        await asyncio.sleep(ttft + usage["completion_tokens"] / self.tokens_per_second)
+        return content, usage
+
+    async def open_stream(
+        self, system_prompt: str, user_prompt: str, max_tokens: int, usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        ttft = self._ttft_seconds()
+        await self._maybe_fail(ttft)
+        content, final_usage = self._respond(system_prompt, user_prompt, max_tokens)
+        await asyncio.sleep(ttft)
+
+        async def deltas():
+            # ~8 tokens per chunk, paced to the configured generation speed
+            chunk_count = max(1, final_usage["completion_tokens"] // 8)
+            chunk_chars = max(1, -(-len(content) // chunk_count))
+            pause = final_usage["completion_tokens"] / self.tokens_per_second / chunk_count
+            for start in range(0, len(content), chunk_chars):
+                yield content[start:start + chunk_chars]
+                await asyncio.sleep(pause)
+            usage.update(final_usage)
+
+        return deltas()
+
+
+def create_provider() -> LLMProvider:
+    """The provider selected by LLM_PROVIDER."""
+    if settings.LLM_PROVIDER == "fake":
+        return FakeProvider(
+            ttft_ms=settings.FAKE_LLM_TTFT_MS,
+            latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+            tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+            completion_tokens=settings.FAKE_LLM_COMPLETION_TOKENS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            seed=settings.FAKE_LLM_SEED,
+        )
+    if settings.LLM_PROVIDER != "groq":
+        raise ValueError(f"Unknown LLM_PROVIDER {settings.LLM_PROVIDER!r}, expected 'groq' or 'fake'")
+    # Retries are the governor's job, so the SDK's own retry loop is disabled
+    return GroqProvider(AsyncGroq(api_key=settings.GROQ_API_KEY, max_retries=0), settings.GROQ_MODEL)
@@ -0,0 +1,25 @@
+import math
+import re
+
+# Letter runs, digit runs and single symbols, roughly how BPE vocabularies split text
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]|_")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local estimate of how many tokens `text` costs, without loading a tokenizer.
+    Common words are one token and long words a few; digits go in groups of three and
+    punctuation is a token each. Meant for budgeting and comparing prompts, not billing:
+    the real counts come back in the completion's usage.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        if piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif len(piece) > 1 or piece.isalpha():
+            tokens += math.ceil(len(piece) / 7)
+        else:
+            tokens += 1
+    return tokens
@@ -0,0 +1,121 @@
+import hashlib
+import os
+import tempfile
+from typing import BinaryIO, Iterable
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class SpooledUpload:
+    """
+    An uploaded file written to a named temp file on disk.
+    A named file (rather than SpooledTemporaryFile) lets the parser memory-map it or open it
+    by path and lets the storage client stream from it, so the bytes are never held in memory.
+    """
+
+    def __init__(self, path: str, size: int, sha256: str, content_type: str | None, filename: str | None):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256  # hex digest of the file content, computed while spooling
+        self.content_type = content_type
+        self.filename = filename
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large. Maximum size is {max_bytes // (1024 * 1024)} MB")
+
+
+async def spool_upload(file: UploadFile, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE) -> SpooledUpload:
+    """
+    Copy an upload to disk in fixed-size chunks, rejecting it with 413 as soon as it exceeds `max_bytes`.
+    The content hash is computed on the same pass, so fingerprinting costs no extra read.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    tmp = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(max_bytes)
+            digest.update(chunk)
+            tmp.write(chunk)
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        raise
+    tmp.close()
+    return SpooledUpload(tmp.name, size, digest.hexdigest(), file.content_type, file.filename)
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects oversized request bodies on upload routes before they are fully received:
+    immediately when Content-Length is too big, otherwise as soon as the streamed body
+    crosses the limit. In the streamed case the app sees the client disconnect; whatever
+    it does about the truncated body is discarded and the client gets the 413.
+    """
+
+    def __init__(self, app, max_body_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        reject = JSONResponse(status_code=413, content={"detail": "File too large"})
+        length = dict(scope["headers"]).get(b"content-length")
+        if length and length.isdigit() and int(length) > self.max_body_bytes:
+            await reject(scope, receive, send)
+            return
+
+        received = 0
+        overflowed = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, overflowed
+            if overflowed:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raising here would surface as the app's own 400 "error parsing the body";
+                    # a disconnect stops it reading without producing a response we'd have to keep
+                    overflowed = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if overflowed and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not overflowed:
+                raise
+        if overflowed and not response_started:
+            await reject(scope, receive, send)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.core.groq_client import chat_completion
+from app.core.supabase import get_supabase_service_role
+from app.services.prompt_builder import Prompt, PromptBuilder
+from app.services.resume_digest import format_digest_highlights, format_digest_profile, resume_digest
+
+FEEDBACK_MAX_ATTEMPTS = 3       # after this many failed generations the row is marked failed
+FEEDBACK_SWEEP_BATCH = 50       # pending rows picked up per sweep
+FEEDBACK_RESUME_CHARS = 3000    # resume text the prompt carried before digests, the savings baseline
+FEEDBACK_SYSTEM_PROMPT = "You are a strict JSON-producing Career Coach assistant."
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _feedback_prompt(job: Dict[str, Any], resume: Dict[str, Any]) -> Prompt:
+    digest = resume_digest(resume)
+    return PromptBuilder("application_feedback", FEEDBACK_SYSTEM_PROMPT) \
+        .add("""You are an expert tech recruiter and career coach. Review this applicant's resume against the Job Description.
+Return EXACTLY a JSON array of 3 concise, highly actionable sentences explaining how the applicant could improve their resume, cover letter, or interview strategy for THIS specific role.
+Do not include any other text, markdown blocks, or conversational filler. Only the strict JSON array of 3 strings.
+""") \
+        .add(f"Job Requirements: {job.get('requirements', '')}", priority=3) \
+        .add(f"Job Description: {job.get('description', '')}", priority=1) \
+        .add("Applicant Resume Digest:\n" + format_digest_profile(digest),
+             replaces=f"Applicant Resume Text: {(resume.get('raw_text') or '')[:FEEDBACK_RESUME_CHARS]}") \
+        .add(format_digest_highlights(digest), priority=2, replaces="") \
+        .build()
+
+
+def _parse_feedback(content: str) -> List[str]:
+    """The tips in the model's JSON array. Raises if the output holds no array."""
+    parsed = json.loads(content[content.find("["):content.rfind("]") + 1])
+    if not isinstance(parsed, list):
+        raise ValueError("feedback is not a JSON array")
+    return [str(tip) for tip in parsed[:3]]
+
+
+def _lease_held(application: Dict[str, Any]) -> bool:
+    """Whether another worker claimed the row within the lease and may still be generating it."""
+    claimed_at = application.get("ai_feedback_updated_at")
+    if not application.get("ai_feedback_attempts") or not claimed_at:
+        return False  # never claimed
+    claimed_at = datetime.fromisoformat(str(claimed_at).replace("Z", "+00:00"))
+    return _now() - claimed_at < timedelta(seconds=settings.APPLICATION_FEEDBACK_LEASE_SECONDS)
+
+
+def _claim(sb, application: Dict[str, Any]) -> bool:
+    """
+    Claim a pending application for generation by bumping its attempt count from the value we read.
+    Only one worker's update matches, and a row claimed within the lease is left to its worker,
+    so a row is never generated twice concurrently.
+    """
+    if _lease_held(application):
+        return False
+    attempts = application.get("ai_feedback_attempts") or 0
+    result = sb.table("applications").update({
+        "ai_feedback_attempts": attempts + 1,
+        "ai_feedback_updated_at": _now().isoformat(),
+    }).eq("id", application["id"]).eq("ai_feedback_status", "pending").eq("ai_feedback_attempts", attempts).execute()
+    return bool(result.data)
+
+
+async def generate_application_feedback(sb, application_id: str):
+    """
+    Generate the AI feedback for a pending application and write it back to the row.
+    Run in the background after the application is inserted, and by the sweeper for rows
+    whose generation was interrupted. A failed attempt leaves the row pending for the
+    sweeper until FEEDBACK_MAX_ATTEMPTS is reached.
+    """
+    rows = sb.table("applications").select(
+        "id, user_id, job_id, ai_feedback_status, ai_feedback_attempts, ai_feedback_updated_at"
+    ).eq("id", application_id).execute().data
+    if not rows or rows[0].get("ai_feedback_status") != "pending":
+        return
+    application = rows[0]
+    if not _claim(sb, application):
+        return  # another worker has it
+    attempt = (application.get("ai_feedback_attempts") or 0) + 1
+
+    try:
+        job_res = sb.table("jobs").select("requirements, description").eq("id", application["job_id"]).execute()
+        resume_res = sb.table("resumes").select(
+            "raw_text, digest, skills, experience_years, education_level, industry, seniority"
+        ).eq("user_id", application["user_id"]).execute()
+        ai_feedback: List[str] = []
+        if job_res.data and resume_res.data:
+            prompt = _feedback_prompt(job_res.data[0], resume_res.data[0])
+            content, usage = await chat_completion(
+                system_prompt=FEEDBACK_SYSTEM_PROMPT,
+                user_prompt=prompt.text,
+                max_tokens=300,
+                validate=_parse_feedback,
+            )
+            ai_feedback = _parse_feedback(content)
+
+            # Log Token Usage (cache hits spent nothing)
+            if usage["total_tokens"]:
+                sb.table("token_usage_logs").insert({
+                    "user_id": application["user_id"],
+                    "endpoint": "/api/applications",
+                    "input_tokens": usage["prompt_tokens"],
+                    "output_tokens": usage["completion_tokens"],
+                    "total_tokens": usage["total_tokens"],
+                    "prompt_tokens_saved": prompt.tokens_saved,
+                }).execute()
+
+        sb.table("applications").update({
+            "ai_feedback": ai_feedback,
+            "ai_feedback_status": "ready",
+            "ai_feedback_updated_at": _now().isoformat(),
+        }).eq("id", application_id).execute()
+    except Exception as e:
+        print(f"Feedback generation failed for application {application_id} (attempt {attempt}): {e}")
+        if attempt >= FEEDBACK_MAX_ATTEMPTS:
+            try:
+                sb.table("applications").update({
+                    "ai_feedback_status": "failed",
+                    "ai_feedback_updated_at": _now().isoformat(),
+                }).eq("id", application_id).execute()
+            except Exception as e:
+                print(f"Could not mark feedback failed for application {application_id}: {e}")
+
+
+async def sweep_pending_feedback(sb) -> int:
+    """
+    Restart generation for pending applications nobody has touched within the lease (e.g. after a restart),
+    and mark failed the ones whose last attempt was interrupted. Returns how many were picked up.
+    """
+    lease_expired = (_now() - timedelta(seconds=settings.APPLICATION_FEEDBACK_LEASE_SECONDS)).isoformat()
+    # The worker of the final attempt died before recording the outcome; nobody else will retry it
+    abandoned = sb.table("applications").update({
+        "ai_feedback_status": "failed",
+        "ai_feedback_updated_at": _now().isoformat(),
+    }).eq("ai_feedback_status", "pending").gte("ai_feedback_attempts", FEEDBACK_MAX_ATTEMPTS) \
+        .lt("ai_feedback_updated_at", lease_expired).execute().data or []
+    if abandoned:
+        print(f"Marked feedback failed for {len(abandoned)} applications whose last attempt was interrupted")
+
+    rows = sb.table("applications").select("id").eq("ai_feedback_status", "pending") \
+        .lt("ai_feedback_attempts", FEEDBACK_MAX_ATTEMPTS).lt("ai_feedback_updated_at", lease_expired) \
+        .order("ai_feedback_updated_at").limit(FEEDBACK_SWEEP_BATCH).execute().data or []
+    # The LLM governor bounds how many of these run upstream at once
+    await asyncio.gather(*(generate_application_feedback(sb, row["id"]) for row in rows))
+    return len(rows)
+
+
+async def run_feedback_sweeper(interval_seconds: Optional[float] = None):
+    """Background loop started with the app: periodically resumes interrupted feedback generation."""
+    interval = settings.APPLICATION_FEEDBACK_SWEEP_SECONDS if interval_seconds is None else interval_seconds
+    try:
+        sb = get_supabase_service_role()
+    except ValueError as e:
+        print(f"Application feedback sweeper disabled: {e}")
+        return
+    while True:
+        try:
+            picked = await sweep_pending_feedback(sb)
+            if picked:
+                print(f"Resumed feedback generation for {picked} pending applications")
+        except Exception as e:
+            print(f"Application feedback sweep failed: {e}")
+        await asyncio.sleep(interval)
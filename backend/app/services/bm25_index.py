@@ -0,0 +1,154 @@
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; keeps tech terms like 'c++', 'node.js' and 'ci-cd' intact."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class BM25Index:
+    """
+    Incremental BM25 inverted index over job descriptions.
+
+    Document frequencies and lengths are updated in place on add/remove, so IDF always
+    reflects the current corpus. A query only walks the postings of its own terms.
+    Scores are returned as a 0-1 ratio of the document's best achievable BM25 score
+    (the score it would get if the query contained every one of its terms), which keeps
+    the sparse half of hybrid scoring on the same scale as the old overlap ratio.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[Hashable, int]] = {}
+        self._doc_terms: Dict[Hashable, Counter] = {}
+        self._doc_len: Dict[Hashable, int] = {}
+        self._versions: Dict[Hashable, Optional[str]] = {}
+        self._total_len = 0
+        # Bumped on every corpus change; cached per-document normalizers are tagged with it
+        self._generation = 0
+        self._norms: Dict[Hashable, tuple] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_len
+
+    def is_current(self, doc_id: Hashable, version: Optional[str]) -> bool:
+        """True if the document is indexed at exactly this version."""
+        with self._lock:
+            return doc_id in self._doc_len and self._versions.get(doc_id) == version
+
+    def add(self, doc_id: Hashable, tokens: Iterable[str], version: Optional[str] = None) -> None:
+        """Index (or re-index) a document. A no-op if this version is already indexed."""
+        with self._lock:
+            if doc_id in self._doc_len:
+                if version is not None and self._versions.get(doc_id) == version:
+                    return
+                self._remove(doc_id)
+            terms = Counter(tokens)
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            length = sum(terms.values())
+            self._doc_terms[doc_id] = terms
+            self._doc_len[doc_id] = length
+            self._versions[doc_id] = version
+            self._total_len += length
+            self._generation += 1
+
+    def remove(self, doc_id: Hashable) -> None:
+        with self._lock:
+            if doc_id in self._doc_len:
+                self._remove(doc_id)
+                self._generation += 1
+
+    def _remove(self, doc_id: Hashable) -> None:
+        for term in self._doc_terms.pop(doc_id):
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+        self._versions.pop(doc_id, None)
+        self._norms.pop(doc_id, None)
+
+    def _idf(self, term: str, n_docs: int, extra_df: int = 0) -> float:
+        df = len(self._postings.get(term, ())) + extra_df
+        return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _term_weight(self, tf: int, length: int, avgdl: float) -> float:
+        return tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avgdl))
+
+    def _max_score(self, terms: Counter, length: int, n_docs: int, avgdl: float, extra_df: int = 0) -> float:
+        return sum(
+            self._idf(t, n_docs, extra_df) * self._term_weight(tf, length, avgdl) for t, tf in terms.items()
+        )
+
+    def _norm(self, doc_id: Hashable, n_docs: int, avgdl: float) -> float:
+        cached = self._norms.get(doc_id)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1]
+        norm = self._max_score(self._doc_terms[doc_id], self._doc_len[doc_id], n_docs, avgdl)
+        self._norms[doc_id] = (self._generation, norm)
+        return norm
+
+    def query(self, query_terms: Iterable[str], doc_ids: Optional[Iterable[Hashable]] = None) -> Dict[Hashable, float]:
+        """
+        Score indexed documents against a bag of query terms (term repetition is ignored).
+        Returns {doc_id: ratio} for documents sharing at least one term, optionally
+        restricted to `doc_ids`.
+        """
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if n_docs == 0:
+                return {}
+            avgdl = self._total_len / n_docs or 1.0
+            wanted = set(doc_ids) if doc_ids is not None else None
+            raw: Dict[Hashable, float] = {}
+            for term in set(query_terms):
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                idf = self._idf(term, n_docs)
+                for doc_id, tf in docs.items():
+                    if wanted is not None and doc_id not in wanted:
+                        continue
+                    raw[doc_id] = raw.get(doc_id, 0.0) + idf * self._term_weight(tf, self._doc_len[doc_id], avgdl)
+            result = {}
+            for doc_id, score in raw.items():
+                norm = self._norm(doc_id, n_docs, avgdl)
+                result[doc_id] = score / norm if norm > 0 else 0.0
+            return result
+
+    def score_tokens(self, query_terms: Iterable[str], doc_tokens: Iterable[str]) -> float:
+        """Score a document that is not in the index, using the current corpus statistics."""
+        terms = Counter(doc_tokens)
+        if not terms:
+            return 0.0
+        with self._lock:
+            # Treat the document as if it were part of the corpus
+            n_docs = len(self._doc_len) + 1
+            length = sum(terms.values())
+            avgdl = (self._total_len + length) / n_docs
+            norm = self._max_score(terms, length, n_docs, avgdl, extra_df=1)
+            query = set(query_terms)
+            score = sum(
+                self._idf(t, n_docs, 1) * self._term_weight(tf, length, avgdl)
+                for t, tf in terms.items() if t in query
+            )
+        return score / norm if norm > 0 else 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._doc_len), "terms": len(self._postings), "total_tokens": self._total_len}
+
+
+# Index over active job descriptions, shared by every scoring path in this process
+job_index = BM25Index()
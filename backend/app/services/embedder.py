@@ -1,29 +1,181 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from typing import List, Tuple
 import numpy as np
+from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache, cache_key
 
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
-    _model = SentenceTransformer('all-MiniLM-L6-v2')
-    HAS_TRANSFORMERS = True
-except Exception:
-    HAS_TRANSFORMERS = False
-    _model = None
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_DIM = 384
+
+# The model (and torch) is loaded on first use rather than at import time so that
+# workers, scripts and non-embedding routes start without paying for it.
+_model = None
+_model_status = "not_loaded"  # not_loaded -> loading -> ready | unavailable
+_model_lock = threading.Lock()
+
+embedding_cache = EmbeddingCache(
+    settings.EMBED_CACHE_SIZE,
+    settings.EMBED_CACHE_PATH,
+    settings.EMBED_CACHE_DISK_MAX_ENTRIES,
+)
+
+
+class EmbeddingBatcher:
+    """
+    Collects embedding requests from concurrent callers and encodes them together.
+    A batch is flushed once it reaches `max_batch_size` texts or the oldest request
+    has waited `max_wait_ms`, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                vectors = _encode([text for text, _ in batch])
+                for (_, future), vec in zip(batch, vectors):
+                    future.set_result(vec)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+
+_batcher: EmbeddingBatcher | None = None
+_batcher_lock = threading.Lock()
+
+
+def get_model():
+    """Return the SentenceTransformer, loading it on first call. Returns None if unavailable."""
+    global _model, _model_status
+    if _model_status in ("ready", "unavailable"):
+        return _model
+    with _model_lock:
+        if _model_status in ("ready", "unavailable"):
+            return _model
+        _model_status = "loading"
+        try:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+            _model_status = "ready"
+        except Exception as e:
+            print(f"Embedding model unavailable, falling back to zero vectors: {e}")
+            _model = None
+            _model_status = "unavailable"
+    return _model
+
+
+def warm_up():
+    """Load the model and run one forward pass so the first real request is not slow."""
+    started = time.monotonic()
+    model = get_model()
+    if model is not None:
+        model.encode(["warm up"])
+        print(f"Embedding model warmed up in {time.monotonic() - started:.2f}s")
+
+
+def is_ready() -> bool:
+    """True once embedding requests can be served without waiting for a model load."""
+    return _model_status in ("ready", "unavailable")
+
+
+def model_status() -> str:
+    return _model_status
+
+
+def _get_batcher() -> EmbeddingBatcher:
+    global _batcher
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(settings.EMBED_BATCH_SIZE, settings.EMBED_BATCH_WAIT_MS)
+    return _batcher
+
+
+def _encode(texts: List[str]) -> List[List[float]]:
+    """Run one forward pass over `texts`."""
+    embs = get_model().encode(texts, batch_size=settings.EMBED_BATCH_SIZE)
+    return [emb.tolist() for emb in embs]
 
 
 def get_embedding(text: str) -> List[float]:
-    """Generate embedding for text."""
-    if HAS_TRANSFORMERS and _model:
-        emb = _model.encode([text])[0]
-        return emb.tolist()
+    """Generate embedding for text. Concurrent callers share a single batched forward pass."""
+    if get_model() is not None:
+        key = cache_key(EMBEDDING_MODEL_NAME, text)
+        vec = embedding_cache.get(key)
+        if vec is None:
+            vec = _get_batcher().submit(text).result()
+            embedding_cache.set(key, vec)
+        return vec
     # Fallback: return zeros
-    return [0.0] * 384
+    return [0.0] * EMBEDDING_DIM
+
+
+async def aget_embedding(text: str) -> List[float]:
+    """Async variant of `get_embedding` that waits for the batch without blocking the event loop."""
+    model = get_model() if is_ready() else await asyncio.to_thread(get_model)
+    if model is not None:
+        key = cache_key(EMBEDDING_MODEL_NAME, text)
+        vec = embedding_cache.get(key)
+        if vec is None:
+            vec = await asyncio.wrap_future(_get_batcher().submit(text))
+            embedding_cache.set(key, vec)
+        return vec
+    return [0.0] * EMBEDDING_DIM
+
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """Generate embeddings for many texts in one batched call. Only cache misses are encoded."""
+    if not texts:
+        return []
+    if get_model() is None:
+        return [[0.0] * EMBEDDING_DIM for _ in texts]
+
+    keys = [cache_key(EMBEDDING_MODEL_NAME, t) for t in texts]
+    results: List[List[float] | None] = [embedding_cache.get(k) for k in keys]
+    missing = [i for i, vec in enumerate(results) if vec is None]
+    if missing:
+        encoded = _encode([texts[i] for i in missing])
+        for i, vec in zip(missing, encoded):
+            embedding_cache.set(keys[i], vec)
+            results[i] = vec
+    return results
 
 
 def compute_cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
     """Compute cosine similarity between two vectors."""
     if not vec1 or not vec2:
         return 0.0
-    a = np.array(vec1).reshape(1, -1)
-    b = np.array(vec2).reshape(1, -1)
-    return float(cosine_similarity(a, b)[0][0])
+    a = np.asarray(vec1, dtype=np.float64)
+    b = np.asarray(vec2, dtype=np.float64)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    if norm == 0:
+        return 0.0
+    return float(np.dot(a, b) / norm)
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from app.core.cache import LRUCache
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Content address for an embedding: hash of the model name and whitespace-normalized text."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\x00{normalized}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache: a bounded in-memory LRU in front of a SQLite file
+    that survives restarts. Vectors are stored on disk as raw float32 bytes.
+    The SQLite file (and its directory) is opened on first use, not at construction,
+    so importing the embedder touches no disk.
+    """
+
+    def __init__(self, max_memory_entries: int, db_path: Optional[str] = None, max_disk_entries: int = 0):
+        self.memory = LRUCache(max_memory_entries)
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._disk_opened = not db_path  # no path: the disk tier stays disabled
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        """The disk tier's connection, opened on first call; None if disabled or it failed to open. Call with the lock held."""
+        if self._disk_opened:
+            return self._conn
+        self._disk_opened = True
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, "
+                "created_at REAL DEFAULT (strftime('%s','now')))"
+            )
+            conn.commit()
+            self._conn = conn
+        except Exception as e:
+            print(f"Embedding disk cache disabled: {e}")
+        return self._conn
+
+    def get(self, key: str) -> Optional[List[float]]:
+        vec = self.memory.get(key)
+        if vec is not None:
+            return vec
+        with self._lock:
+            conn = self._disk()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vec = np.frombuffer(row[0], dtype=np.float32).tolist()
+        self.disk_hits += 1
+        self.memory.set(key, vec)
+        return vec
+
+    def set(self, key: str, vec: List[float]) -> None:
+        self.memory.set(key, vec)
+        blob = np.asarray(vec, dtype=np.float32).tobytes()
+        with self._lock:
+            conn = self._disk()
+            if conn is None:
+                return
+            conn.execute("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", (key, blob))
+            self.disk_writes += 1
+            if self.max_disk_entries and self.disk_writes % 256 == 0:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_disk_entries,),
+                )
+            conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        mem = self.memory.stats()
+        return {
+            "memory_size": mem["size"],
+            "memory_hits": mem["hits"],
+            "disk_hits": self.disk_hits,
+            # A memory miss that the disk tier answered is still a cache hit
+            "misses": mem["misses"] - self.disk_hits,
+            "evictions": mem["evictions"],
+            "disk_writes": self.disk_writes,
+        }
@@ -1,4 +1,32 @@
-from typing import List, Dict, Any
+import base64
+import heapq
+import json
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class RankingContext(NamedTuple):
+    """The parts of the user's resume the ranker needs, normalized once per request."""
+    skills: FrozenSet[str]
+    industry: str
+
+
+def ranking_context(user_resume: Dict[str, Any]) -> RankingContext:
+    return RankingContext(
+        skills=frozenset(s.lower() for s in user_resume.get("skills") or []),
+        industry=user_resume.get("industry", ""),
+    )
+
+
+def _relevance(job: Dict[str, Any], context: RankingContext, match_score: float) -> float:
+    # Skill overlap boost
+    overlap = len(context.skills.intersection(map(str.lower, job.get("skills_required") or ())))
+    skill_boost = min(overlap * 10, 50)
+
+    # Industry match boost
+    industry_boost = 30 if context.industry == job.get("industry", "") else 0
+
+    relevance = match_score * 0.6 + skill_boost * 0.25 + industry_boost * 0.15
+    return round(relevance, 2)
 
 
 def rank_jobs(jobs: List[Dict[str, Any]], user_resume: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -7,28 +35,73 @@ def rank_jobs(jobs: List[Dict[str, Any]], user_resume: Dict[str, Any]) -> List[D
     Applies a boost based on skill overlap and industry match.
     Returns jobs sorted by relevance score descending.
     """
-    user_skills = set(s.lower() for s in user_resume.get("skills", []))
-    user_industry = user_resume.get("industry", "")
-
-    ranked = []
+    context = ranking_context(user_resume)
     for job in jobs:
-        job_skills = set(s.lower() for s in job.get("skills_required", []))
-        job_industry = job.get("industry", "")
+        # Match score from scoring engine (if available)
+        job["relevance_score"] = _relevance(job, context, job.get("match_score", 50))
+
+    ranked = list(jobs)
+    ranked.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+    return ranked
 
-        # Skill overlap boost
-        overlap = len(user_skills & job_skills)
-        skill_boost = min(overlap * 10, 50)
 
-        # Industry match boost
-        industry_boost = 30 if user_industry == job_industry else 0
+def encode_cursor(relevance: float, job_id: str) -> str:
+    """Opaque page cursor: the ranking key of the last job on the previous page."""
+    raw = json.dumps([relevance, job_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-        # Match score from scoring engine (if available)
-        match_score = job.get("match_score", 50)
 
-        relevance = match_score * 0.6 + skill_boost * 0.25 + industry_boost * 0.15
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        relevance, job_id = json.loads(raw)
+        return float(relevance), str(job_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
 
-        job["relevance_score"] = round(relevance, 2)
-        ranked.append(job)
 
-    ranked.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-    return ranked
+def top_k_jobs(
+    jobs: Sequence[Dict[str, Any]],
+    user_resume: Dict[str, Any],
+    k: int,
+    match_scores: Optional[Sequence[float]] = None,
+    cursor: Optional[str] = None,
+    context: Optional[RankingContext] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Return the `k` most relevant jobs after `cursor`, plus the cursor for the next page (None on the last page).
+
+    Jobs are ordered by relevance descending, ties broken by job id, so pages are stable
+    and never overlap. Only the top `k` are selected (a heap, O(n log k)) instead of
+    sorting everything. Pass `match_scores` (aligned with `jobs`) to rank without
+    reading or writing job["match_score"]; the caller's dicts are never mutated, the
+    returned jobs are shallow copies carrying `relevance_score` (and `match_score`).
+    """
+    context = context or ranking_context(user_resume)
+    after = None
+    if cursor:
+        relevance, job_id = decode_cursor(cursor)
+        after = (-relevance, job_id)
+
+    candidates = []
+    for i, job in enumerate(jobs):
+        match_score = match_scores[i] if match_scores is not None else job.get("match_score", 50)
+        key = (-_relevance(job, context, match_score), str(job.get("id", "")))
+        if after is None or key > after:
+            candidates.append((key, i, match_score))
+
+    top = heapq.nsmallest(k, candidates)
+    page = []
+    for (neg_relevance, _), i, match_score in top:
+        ranked = dict(jobs[i])
+        if match_scores is not None:
+            ranked["match_score"] = match_score
+        ranked["relevance_score"] = -neg_relevance
+        page.append(ranked)
+
+    next_cursor = None
+    if len(candidates) > k and top:
+        (neg_relevance, job_id), _, _ = top[-1]
+        next_cursor = encode_cursor(-neg_relevance, job_id)
+    return page, next_cursor
@@ -0,0 +1,321 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.config import settings
+from app.core.supabase import get_supabase_service_role
+from app.services.feed_ranker import top_k_jobs
+from app.services.scorer import score_jobs, score_pair
+from app.services.scoring_profiles import JOB_PROFILE_COLUMNS, get_job_profile, get_resume_profile, peek_job_profile
+
+FEED_LATEST_LIMIT = 50      # jobs shown to users without a resume embedding
+FEED_BUCKET_SIZE = 6        # jobs shown per section
+RERANK_CHUNK_SIZE = 50      # candidates scored between latency budget checks
+FEED_PATCH_ATTEMPTS = 3     # conditional writes of one feed before giving up on a patch
+BUCKET_NAMES = ("highly_relevant", "based_on_skills", "trending")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _bucket_name(match_score: float) -> str:
+    if match_score >= 70:
+        return "highly_relevant"
+    if match_score >= 40:
+        return "based_on_skills"
+    return "trending"
+
+
+def _similarity_to_score(similarity: float) -> int:
+    # Basic scaling: 0.7 sim -> 70 score, etc.
+    return min(max(int(similarity * 100), 0), 100)
+
+
+def latest_resume(sb, user_id: str) -> Optional[Dict[str, Any]]:
+    result = sb.table("resumes").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+def _candidate_pool(sb, resume: Dict[str, Any], pool_size: int) -> List[dict]:
+    """Stage 1: the `pool_size` nearest active jobs from the pgvector ANN index, scored by similarity."""
+    # Use pgvector RPC for native database semantic search
+    try:
+        rpc_result = sb.rpc(
+            "match_jobs_for_resume",
+            {"resume_embedding": resume["embedding"], "match_limit": pool_size}
+        ).execute()
+        jobs = rpc_result.data or []
+    except Exception as e:
+        print(f"Error calling pgvector RPC: {e}")
+        # Fallback to standard fetch if RPC fails
+        fallback = sb.table("jobs").select("*, companies(name, logo_url)").eq("status", "active").limit(pool_size).execute()
+        jobs = fallback.data or []
+
+    # Re-map rpc format to match standard api response if needed
+    for job in jobs:
+        # Add company dict mapping since RPC returns flat company_name, company_logo_url
+        if "company_name" in job and "companies" not in job:
+            job["companies"] = {"name": job["company_name"], "logo_url": job.get("company_logo_url")}
+
+        # The RPC returns 'similarity' (1 - cosine_distance).
+        # We convert this base semantic similarity to a match_score out of 100 for the frontend.
+        if "similarity" in job:
+            job["match_score"] = _similarity_to_score(job["similarity"])
+        else:
+            job["match_score"] = 50
+    return jobs
+
+
+def _rerank(sb, resume: Dict[str, Any], candidates: List[dict], budget_ms: float) -> Optional[List[dict]]:
+    """
+    Stage 2: re-rank the candidate pool with the full compatibility scorer.
+    RPC rows carry no embedding, so scoring uses the cached job profiles and loads only
+    the jobs missing from the cache. Scoring runs in chunks and gives up (returns None)
+    once the latency budget is spent.
+    """
+    deadline = time.monotonic() + budget_ms / 1000
+    profiles = [peek_job_profile(job) for job in candidates]
+    missing = [job["id"] for job, profile in zip(candidates, profiles) if profile is None]
+    if missing:
+        rows = sb.table("jobs").select(JOB_PROFILE_COLUMNS).in_("id", missing).execute().data or []
+        loaded = {row["id"]: get_job_profile(row) for row in rows}
+        profiles = [profile or loaded.get(job["id"]) for job, profile in zip(candidates, profiles)]
+    pairs = [(job, profile) for job, profile in zip(candidates, profiles) if profile is not None]
+
+    scores = []
+    for start in range(0, len(pairs), RERANK_CHUNK_SIZE):
+        if time.monotonic() > deadline:
+            return None
+        chunk = [profile for _, profile in pairs[start:start + RERANK_CHUNK_SIZE]]
+        scores.extend(score["total_score"] for score in score_jobs(resume, chunk))
+
+    jobs = [job for job, _ in pairs]
+    ranked, _ = top_k_jobs(jobs, resume, len(jobs), match_scores=scores)
+    return ranked
+
+
+def compute_feed(sb, resume: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], Optional[float]]:
+    """
+    Build the bucketed feed for a resume with two-stage retrieval: an ANN candidate pool
+    from pgvector, re-ranked by the compatibility scorer within FEED_RERANK_BUDGET_MS
+    (stage-1 similarity order if the budget runs out).
+    Returns the feed and the cutoff score: the lowest similarity score in the candidate
+    pool when the pool was full (a job scoring below it would not have been fetched), else None.
+    """
+    cutoff = None
+    ranking = "latest"
+
+    if resume and resume.get("embedding"):
+        pool_size = settings.FEED_CANDIDATE_POOL
+        jobs = _candidate_pool(sb, resume, pool_size)
+        if len(jobs) >= pool_size:
+            cutoff = min(job["match_score"] for job in jobs)
+
+        started = time.monotonic()
+        ranked = _rerank(sb, resume, jobs, settings.FEED_RERANK_BUDGET_MS) if jobs else None
+        if ranked is not None:
+            jobs, ranking = ranked, "compatibility"
+        else:
+            ranking = "similarity"
+            if jobs:
+                print(f"Feed re-rank of {len(jobs)} candidates exceeded {settings.FEED_RERANK_BUDGET_MS:.0f}ms "
+                      f"({(time.monotonic() - started) * 1000:.0f}ms), using similarity order")
+    else:
+        # User has no resume or no embedding, fetch latest
+        jobs_result = sb.table("jobs").select("*, companies(name, logo_url)").eq("status", "active").limit(FEED_LATEST_LIMIT).execute()
+        jobs = jobs_result.data or []
+
+    # Categorize sections
+    feed: Dict[str, Any] = {name: [] for name in BUCKET_NAMES}
+    for job in jobs:
+        bucket = feed[_bucket_name(job.get("match_score", 0))]
+        if len(bucket) < FEED_BUCKET_SIZE:
+            job.pop("embedding", None)  # not shown, and the bulk of the stored row
+            bucket.append(job)
+    feed["ranking"] = ranking
+    return feed, cutoff
+
+
+def read_feed(sb, user_id: str) -> Optional[Dict[str, Any]]:
+    """The user's materialized feed row, or None if it was never computed (or the table is unavailable)."""
+    try:
+        result = sb.table("user_feeds").select("*").eq("user_id", user_id).limit(1).execute()
+    except Exception as e:
+        print(f"Error reading materialized feed: {e}")
+        return None
+    return result.data[0] if result.data else None
+
+
+def refresh_user_feed(sb, user_id: str) -> Dict[str, Any]:
+    """Recompute the user's feed from their latest resume and store it. Run in the background after a resume upload."""
+    resume = latest_resume(sb, user_id)
+    feed, cutoff = compute_feed(sb, resume)
+    now = _now()
+    row = {
+        "user_id": user_id,
+        "resume_id": resume["id"] if resume else None,
+        "feed": feed,
+        "cutoff_score": cutoff,
+        "computed_at": now,
+        "updated_at": now,
+    }
+    try:
+        sb.table("user_feeds").upsert(row).execute()
+    except Exception as e:
+        print(f"Error storing materialized feed for user {user_id}: {e}")
+    return row
+
+
+def drop_inactive_jobs(sb, feed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The feed without the jobs paused or closed since it was stored. Stored feeds are only ever
+    patched with new jobs, so the status of the (at most a few dozen) jobs shown is checked on
+    every read, as the RPC's status filter did when feeds were computed per request.
+    """
+    ids = list({job["id"] for name in BUCKET_NAMES for job in feed.get(name, []) if job.get("id")})
+    if not ids:
+        return feed
+    rows = sb.table("jobs").select("id").in_("id", ids).eq("status", "active").execute().data or []
+    active = {row["id"] for row in rows}
+    return {**feed, **{name: [job for job in feed.get(name, []) if job.get("id") in active] for name in BUCKET_NAMES}}
+
+
+def feed_age_seconds(row: Dict[str, Any]) -> float:
+    """Seconds since the feed was last fully recomputed."""
+    computed_at = datetime.fromisoformat(str(row["computed_at"]).replace("Z", "+00:00"))
+    return max(0.0, (datetime.now(timezone.utc) - computed_at).total_seconds())
+
+
+def _feed_order_key(entry: dict, ranking: Optional[str]) -> tuple:
+    """The order jobs sit in within a bucket: relevance (ties by id) when compatibility-ranked, else match score."""
+    if ranking == "compatibility":
+        return (-entry.get("relevance_score", 0), str(entry.get("id", "")))
+    return (-entry.get("match_score", 0),)
+
+
+def _insert_into_feed(feed: Dict[str, Any], entry: dict) -> bool:
+    """
+    Insert a scored job entry into its bucket if it would have ranked there, using the
+    bucket's own sort key. Returns whether the feed changed.
+    """
+    name = _bucket_name(entry["match_score"])
+    ranking = feed.get("ranking")
+    key = _feed_order_key(entry, ranking)
+    bucket = [j for j in feed.get(name, []) if j.get("id") != entry["id"]]
+    if len(bucket) >= FEED_BUCKET_SIZE and key >= _feed_order_key(bucket[-1], ranking):
+        return False
+    position = next((i for i, j in enumerate(bucket) if _feed_order_key(j, ranking) > key), len(bucket))
+    bucket.insert(position, entry)
+    feed[name] = bucket[:FEED_BUCKET_SIZE]
+    return True
+
+
+def _feed_entry(entry: dict, feed: Dict[str, Any], resume: Dict[str, Any], similarity_score: int) -> dict:
+    """The job as it would appear in this feed: with the compatibility match and relevance scores when the feed uses them."""
+    if feed.get("ranking") != "compatibility":
+        return {**entry, "match_score": similarity_score}
+    match_score = score_pair(resume, entry)["total_score"]
+    ranked, _ = top_k_jobs([entry], resume, 1, match_scores=[match_score])
+    return ranked[0]
+
+
+def _patch_feed(sb, row: Dict[str, Any], entry: dict, resume: Dict[str, Any], similarity_score: int) -> bool:
+    """
+    Insert the job into one stored feed with a conditional write: the update only applies if
+    the row's updated_at is still the one we read, so a concurrent refresh_user_feed or
+    another patch is never overwritten. On a conflict the row is re-read and the patch retried.
+    """
+    for _ in range(FEED_PATCH_ATTEMPTS):
+        feed = row.get("feed") or {}
+        if not _insert_into_feed(feed, _feed_entry(entry, feed, resume, similarity_score)):
+            return False
+        result = sb.table("user_feeds").update({"feed": feed, "updated_at": _now()}) \
+            .eq("user_id", row["user_id"]).eq("updated_at", row["updated_at"]).execute()
+        if result.data:
+            return True
+        fresh = sb.table("user_feeds").select("user_id, resume_id, feed, cutoff_score, updated_at") \
+            .eq("user_id", row["user_id"]).limit(1).execute().data
+        if not fresh or fresh[0].get("resume_id") != row.get("resume_id"):
+            return False  # recomputed for another resume; that refresh already saw this job
+        row = fresh[0]
+    print(f"Gave up patching the feed of user {row['user_id']} after {FEED_PATCH_ATTEMPTS} conflicting writes")
+    return False
+
+
+def patch_feeds_for_job(job: Dict[str, Any], page_size: int = 200):
+    """
+    Add a newly posted job to the materialized feeds it would rank in, without recomputing them.
+    Feeds are scanned a page at a time and the job is scored against every resume on the page
+    in one matrix product. Run in the background after a job is created.
+    """
+    try:
+        sb = get_supabase_service_role()
+    except ValueError as e:
+        print(f"Skipping feed patch for job {job.get('id')}: {e}")
+        return
+    job_vector = get_job_profile(job).embedding
+    if job_vector is None:
+        return
+
+    company = sb.table("companies").select("name, logo_url").eq("id", job["company_id"]).limit(1).execute()
+    company = company.data[0] if company.data else {}
+    entry = {k: v for k, v in job.items() if k != "embedding"}
+    entry["company_name"] = company.get("name")
+    entry["company_logo_url"] = company.get("logo_url")
+    entry["companies"] = {"name": company.get("name"), "logo_url": company.get("logo_url")}
+
+    patched = 0
+    last_user_id = None
+    while True:
+        query = sb.table("user_feeds").select("user_id, resume_id, feed, cutoff_score, updated_at") \
+            .order("user_id").limit(page_size)
+        if last_user_id:
+            query = query.gt("user_id", last_user_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        last_user_id = rows[-1]["user_id"]
+
+        resume_ids = [r["resume_id"] for r in rows if r.get("resume_id")]
+        resumes = sb.table("resumes").select("*").in_("id", resume_ids).execute().data if resume_ids else []
+        resumes = {r["id"]: r for r in resumes or []}
+        vectors = {rid: get_resume_profile(r).embedding for rid, r in resumes.items()}
+
+        feeds = [r for r in rows if vectors.get(r.get("resume_id")) is not None]
+        if not feeds:
+            continue
+        similarities = np.stack([vectors[r["resume_id"]] for r in feeds]) @ job_vector
+
+        for row, similarity in zip(feeds, similarities):
+            similarity_score = _similarity_to_score(float(similarity))
+            cutoff = row.get("cutoff_score")
+            if cutoff is not None and similarity_score <= cutoff:
+                continue  # would not have made the stage-1 candidate pool
+            if _patch_feed(sb, row, entry, resumes[row["resume_id"]], similarity_score):
+                patched += 1
+
+    print(f"Job {job.get('id')} added to {patched} materialized feeds")
+
+
+def feed_staleness(sb, page_size: int = 1000) -> Dict[str, Any]:
+    """Age of the materialized feeds, for the admin dashboard. Rows are paged by user_id so none are cut off by the max-rows limit."""
+    ages: List[float] = []
+    last_user_id = None
+    while True:
+        query = sb.table("user_feeds").select("user_id, computed_at").order("user_id").limit(page_size)
+        if last_user_id:
+            query = query.gt("user_id", last_user_id)
+        rows = query.execute().data or []
+        ages.extend(feed_age_seconds(r) for r in rows)
+        if len(rows) < page_size:
+            break
+        last_user_id = rows[-1]["user_id"]
+    if not ages:
+        return {"feeds": 0}
+    return {
+        "feeds": len(ages),
+        "avg_age_seconds": round(sum(ages) / len(ages), 1),
+        "max_age_seconds": round(max(ages), 1),
+        "older_than_max_age": sum(1 for a in ages if a > settings.FEED_MAX_AGE_SECONDS),
+    }
@@ -0,0 +1,87 @@
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set
+
+_WORD_CHAR = re.compile(r"\w")
+_END = ""
+
+
+class KeywordMatch(NamedTuple):
+    term: str
+    start: int
+    end: int
+
+
+def _is_word(ch: str) -> bool:
+    return bool(_WORD_CHAR.match(ch))
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Turn a character trie into a regex. Longer continuations are tried before stopping."""
+    alts = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch != _END]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if _END in node else body
+
+
+class KeywordMatcher:
+    """
+    Finds every occurrence of a fixed set of lowercase keywords in one scan of the text.
+
+    The keywords are compiled into a single trie-shaped regex evaluated as a lookahead at
+    each candidate position, so matching cost grows with the text length rather than with
+    the number of keywords. The regex reports the longest keyword at each position; any
+    shorter keyword that is a prefix of it (and, with `word_boundary`, ends on a word
+    boundary inside it) is reported too, which gives the same results as searching for
+    each keyword separately with `\\bkeyword\\b` (or a plain substring test).
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundary: bool = True):
+        self.terms = frozenset(t for t in terms if t)
+        self.word_boundary = word_boundary
+
+        trie: Dict[str, dict] = {}
+        for term in self.terms:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[_END] = {}
+
+        body = _trie_pattern(trie) or "(?!)"
+        if word_boundary:
+            pattern = rf"\b(?=({body})\b)"
+        else:
+            pattern = rf"(?=({body}))"
+        self._regex = re.compile(pattern, re.IGNORECASE)
+
+        # Shorter keywords implied by a longer match starting at the same position
+        self._implied: Dict[str, List[str]] = {}
+        for term in self.terms:
+            implied = []
+            for i in range(1, len(term)):
+                prefix = term[:i]
+                if prefix not in self.terms:
+                    continue
+                if word_boundary and _is_word(term[i - 1]) == _is_word(term[i]):
+                    continue
+                implied.append(prefix)
+            if implied:
+                self._implied[term] = implied
+
+    def finditer(self, text: str) -> Iterator[KeywordMatch]:
+        """Yield every keyword occurrence with its offsets into `text` (case-insensitive)."""
+        for m in self._regex.finditer(text):
+            start = m.start(1)
+            term = m.group(1).lower()
+            yield KeywordMatch(term, start, m.end(1))
+            for prefix in self._implied.get(term, ()):
+                yield KeywordMatch(prefix, start, start + len(prefix))
+
+    def find_all(self, text: str) -> Set[str]:
+        """Distinct keywords present in `text`."""
+        found = set()
+        for m in self._regex.finditer(text):
+            term = m.group(1).lower()
+            found.add(term)
+            found.update(self._implied.get(term, ()))
+        return found
@@ -0,0 +1,75 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.core.tokens import estimate_tokens
+
+# Prompt budgets (system + user, estimated tokens) per LLM endpoint
+PROMPT_BUDGETS: Dict[str, int] = {
+    "resume_analysis": 700,
+    "application_feedback": 600,
+    "job_score": 250,
+    "roadmap": 900,
+}
+
+REQUIRED = 1_000_000  # priority of sections that are never trimmed
+
+
+def _shorten(line: str, drop_tokens: int, line_tokens: int) -> str:
+    """Cut roughly `drop_tokens` off the end of a line, at a word boundary."""
+    keep_chars = int(len(line) * (line_tokens - drop_tokens) / line_tokens) - 4
+    return line[:max(0, keep_chars)].rsplit(" ", 1)[0] + " ..."
+
+
+class Prompt(NamedTuple):
+    text: str           # the user prompt
+    tokens: int         # estimated prompt tokens, system prompt included
+    tokens_saved: int   # estimated tokens saved against the untrimmed, pre-digest prompt
+
+
+class PromptBuilder:
+    """
+    Assemble a user prompt from sections and fit it into the endpoint's token budget.
+
+    Sections are kept in the order they were added. When the prompt is over budget, the
+    lowest-priority sections are cut from the end first (whole sections can disappear);
+    REQUIRED sections are never cut. A section can declare the text it `replaces` (e.g. a
+    digest standing in for raw resume text) so the saving is measured against what the
+    endpoint used to send.
+    """
+
+    def __init__(self, endpoint: str, system_prompt: str, budget: Optional[int] = None):
+        self.endpoint = endpoint
+        self.budget = PROMPT_BUDGETS[endpoint] if budget is None else budget
+        self.system_tokens = estimate_tokens(system_prompt)
+        self._sections: List[Tuple[List[str], int]] = []
+        self._baseline = self.system_tokens
+
+    def add(self, text: str, priority: int = REQUIRED, replaces: Optional[str] = None) -> "PromptBuilder":
+        self._sections.append((text.split("\n") if text else [], priority))
+        self._baseline += estimate_tokens(replaces if replaces is not None else text)
+        return self
+
+    def build(self) -> Prompt:
+        sections = [list(lines) for lines, _ in self._sections]
+        sizes = [estimate_tokens("\n".join(lines)) for lines in sections]
+        total = self.system_tokens + sum(sizes)
+        # Lowest priority first; among equals, the later section goes first
+        order = sorted(range(len(sections)), key=lambda i: (self._sections[i][1], -i))
+        for i in order:
+            if total <= self.budget:
+                break
+            if self._sections[i][1] >= REQUIRED:
+                continue
+            lines = sections[i]
+            while lines and total > self.budget:
+                excess = total - self.budget
+                last_size = estimate_tokens(lines[-1])
+                if last_size > excess + 10:
+                    lines[-1] = _shorten(lines[-1], excess, last_size)
+                else:
+                    lines.pop()
+                new_size = estimate_tokens("\n".join(lines))
+                total -= sizes[i] - new_size
+                sizes[i] = new_size
+
+        text = "\n".join("\n".join(lines) for lines in sections if lines)
+        tokens = self.system_tokens + estimate_tokens(text)
+        return Prompt(text, tokens, max(0, self._baseline - tokens))
@@ -0,0 +1,126 @@
+import re
+from typing import Any, Dict, List, Optional
+
+DIGEST_MAX_SKILLS = 25
+DIGEST_MAX_ROLES = 3
+DIGEST_MAX_HIGHLIGHTS = 5
+HIGHLIGHT_MAX_CHARS = 160
+
+ROLE_KEYWORDS = (
+    "engineer", "developer", "manager", "analyst", "designer", "scientist", "consultant",
+    "architect", "lead", "director", "intern", "specialist", "administrator", "coordinator",
+    "officer", "president", "head of", "associate", "technician", "researcher", "programmer",
+)
+ACHIEVEMENT_VERBS = (
+    "led", "built", "designed", "developed", "improved", "reduced", "increased", "launched",
+    "managed", "delivered", "created", "implemented", "automated", "migrated", "scaled",
+    "optimized", "optimised", "grew", "saved", "shipped", "owned", "mentored",
+)
+
+_ROLE_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(k) for k in ROLE_KEYWORDS) + r")\b", re.IGNORECASE)
+_VERB_PATTERN = re.compile(r"^(?:" + "|".join(ACHIEVEMENT_VERBS) + r")\b", re.IGNORECASE)
+_METRIC_PATTERN = re.compile(r"\d+(?:[.,]\d+)?\s*(?:%|x\b|k\b|m\b|\+)|[$€£]\s?\d")
+_BULLET = re.compile(r"^[\s\-•●▪*>•·–]+")
+_TRAILING_DATES = re.compile(r"[\s,|(\-–]*(?:(?:19|20)\d{2}|present|current)[\w\s,/()\-–]*$", re.IGNORECASE)
+
+
+def _clean(line: str) -> str:
+    return " ".join(_BULLET.sub("", line).split())
+
+
+def _roles(lines: List[str]) -> List[str]:
+    """Job titles: short lines naming a role, in resume order (usually most recent first)."""
+    roles: List[str] = []
+    for line in lines:
+        if len(line) > 80 or not _ROLE_PATTERN.search(line):
+            continue
+        title = _TRAILING_DATES.sub("", line).strip(" ,|-–")
+        if not (3 <= len(title) <= 60 and len(title.split()) <= 8):
+            continue
+        # A headline ("Senior Engineer") and the job line that extends it ("Senior Engineer, Acme") are one role
+        same = next((i for i, role in enumerate(roles) if title.lower().startswith(role.lower())
+                     or role.lower().startswith(title.lower())), None)
+        if same is not None:
+            if len(title) > len(roles[same]):
+                roles[same] = title
+            continue
+        roles.append(title)
+        if len(roles) == DIGEST_MAX_ROLES:
+            break
+    return roles
+
+
+def _highlights(lines: List[str]) -> List[str]:
+    """The most concrete achievement lines: measurable results first, then action-verb bullets."""
+    scored = []
+    for i, line in enumerate(lines):
+        if not 30 <= len(line) <= 400:
+            continue
+        score = (2 if _METRIC_PATTERN.search(line) else 0) + (1 if _VERB_PATTERN.match(line) else 0)
+        if score:
+            scored.append((-score, i, line))
+    best = sorted(scored)[:DIGEST_MAX_HIGHLIGHTS]
+    return [
+        line if len(line) <= HIGHLIGHT_MAX_CHARS else line[:HIGHLIGHT_MAX_CHARS].rsplit(" ", 1)[0] + "..."
+        for _, _, line in sorted(best, key=lambda item: item[1])
+    ]
+
+
+def build_resume_digest(
+    raw_text: str,
+    skills: List[str],
+    experience_years: float,
+    education_level: str,
+    industry: str,
+    seniority: str,
+) -> Dict[str, Any]:
+    """
+    Compact summary of a resume for LLM prompts: skills, recent roles, experience and a few
+    achievement highlights. Computed once at upload and stored with the resume, so prompts
+    send a few hundred characters instead of the raw text.
+    """
+    lines = [line for line in (_clean(raw) for raw in (raw_text or "").splitlines()) if line]
+    return {
+        "skills": list(skills or [])[:DIGEST_MAX_SKILLS],
+        "roles": _roles(lines),
+        "experience_years": experience_years,
+        "education_level": education_level,
+        "industry": industry,
+        "seniority": seniority,
+        "highlights": _highlights(lines),
+    }
+
+
+def resume_digest(resume: Dict[str, Any]) -> Dict[str, Any]:
+    """The stored digest of a resume row, computed on the fly for rows uploaded before digests existed."""
+    if resume.get("digest"):
+        return resume["digest"]
+    return build_resume_digest(
+        resume.get("raw_text") or "",
+        resume.get("skills") or [],
+        resume.get("experience_years", 0),
+        resume.get("education_level", "bachelors"),
+        resume.get("industry", "technology"),
+        resume.get("seniority", "junior"),
+    )
+
+
+def format_digest_profile(digest: Dict[str, Any], max_skills: Optional[int] = None) -> str:
+    """The digest's profile lines (everything but the highlights) as prompt text."""
+    skills = digest.get("skills") or []
+    lines = [
+        f"- Skills: {', '.join(skills[:max_skills] if max_skills else skills) or 'None detected'}",
+        f"- Experience: {digest.get('experience_years', 0)} years ({digest.get('seniority', 'junior')})",
+        f"- Education: {digest.get('education_level', 'bachelors')}",
+        f"- Industry: {digest.get('industry', 'technology')}",
+    ]
+    if digest.get("roles"):
+        lines.append(f"- Recent roles: {'; '.join(digest['roles'])}")
+    return "\n".join(lines)
+
+
+def format_digest_highlights(digest: Dict[str, Any]) -> str:
+    highlights = digest.get("highlights") or []
+    if not highlights:
+        return ""
+    return "Highlights:\n" + "\n".join(f"- {h}" for h in highlights)
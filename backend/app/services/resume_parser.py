@@ -1,6 +1,12 @@
+import hashlib
 import io
+import mmap
+import multiprocessing
 import re
-from typing import Optional
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, List, NamedTuple, Optional, Tuple, Union
+from app.core.config import settings
 
 try:
     import fitz  # PyMuPDF
@@ -15,42 +21,148 @@ except ImportError:
     HAS_DOCX = False
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract text from PDF bytes using PyMuPDF."""
+class ParseStats(NamedTuple):
+    kind: str
+    pages_total: int
+    pages_read: int
+    chars: int
+    truncated: bool
+    elapsed_ms: float
+
+
+_page_pool: ProcessPoolExecutor | None = None
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    global _page_pool
+    if _page_pool is None:
+        _page_pool = ProcessPoolExecutor(max_workers=settings.RESUME_PARSE_WORKERS)
+    return _page_pool
+
+
+# PDFs are parsed either from in-memory bytes or from a file path (MuPDF then reads pages on demand)
+PdfSource = Union[bytes, str]
+
+
+def _open_pdf(source: PdfSource):
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _pdf_page_range(source: PdfSource, start: int, stop: int, max_chars: int) -> List[str]:
+    """Extract text from pages [start, stop), stopping early once `max_chars` is collected."""
+    parts = []
+    total = 0
+    with _open_pdf(source) as doc:
+        for i in range(start, stop):
+            text = doc.load_page(i).get_text()
+            parts.append(text)
+            total += len(text)
+            if total >= max_chars:
+                break
+    return parts
+
+
+def _extract_pdf(source: PdfSource, max_pages: int, max_chars: int) -> Tuple[str, ParseStats]:
+    started = time.perf_counter()
+    with _open_pdf(source) as doc:
+        pages_total = doc.page_count
+    pages = min(pages_total, max_pages)
+
+    workers = settings.RESUME_PARSE_WORKERS
+    # Worker processes of a process pool are daemonic and cannot start their own pool
+    can_fork = not multiprocessing.current_process().daemon
+    if workers > 1 and can_fork and pages >= settings.RESUME_PARALLEL_MIN_PAGES:
+        step = -(-pages // workers)
+        futures = [
+            _get_page_pool().submit(_pdf_page_range, source, start, min(start + step, pages), max_chars)
+            for start in range(0, pages, step)
+        ]
+        parts, total = [], 0
+        for future in futures:
+            if total >= max_chars:
+                future.cancel()
+                continue
+            for text in future.result():
+                parts.append(text)
+                total += len(text)
+                if total >= max_chars:
+                    break
+    else:
+        parts = _pdf_page_range(source, 0, pages, max_chars)
+
+    text = "".join(parts).strip()
+    stats = ParseStats("pdf", pages_total, len(parts), len(text),
+                       len(parts) < pages_total, (time.perf_counter() - started) * 1000)
+    return text, stats
+
+
+def _extract_docx(source: BinaryIO, max_chars: int) -> Tuple[str, ParseStats]:
+    started = time.perf_counter()
+    doc = Document(source)
+    parts, total, truncated = [], 0, False
+    for para in doc.paragraphs:
+        parts.append(para.text)
+        total += len(para.text) + 1
+        if total >= max_chars:
+            truncated = True
+            break
+    text = "\n".join(parts).strip()
+    stats = ParseStats("docx", 0, 0, len(text), truncated, (time.perf_counter() - started) * 1000)
+    return text, stats
+
+
+def extract_text_from_pdf(file_bytes: PdfSource, max_pages: Optional[int] = None, max_chars: Optional[int] = None) -> str:
+    """Extract text from PDF bytes (or a PDF file path) using PyMuPDF, reading at most `max_pages` pages / about `max_chars` chars."""
     if not HAS_FITZ:
         return ""
     try:
-        doc = fitz.open(stream=file_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text.strip()
+        text, stats = _extract_pdf(
+            file_bytes,
+            max_pages or settings.RESUME_MAX_PAGES,
+            max_chars or settings.RESUME_MAX_CHARS,
+        )
+        _log_stats(stats)
+        return text
     except Exception as e:
         print(f"PDF extraction error: {e}")
         return ""
 
 
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract text from DOCX bytes."""
+def extract_text_from_docx(file_bytes: Union[bytes, BinaryIO], max_chars: Optional[int] = None) -> str:
+    """Extract text from DOCX bytes (or a seekable binary view), stopping after about `max_chars` chars."""
     if not HAS_DOCX:
         return ""
     try:
-        doc = Document(io.BytesIO(file_bytes))
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text.strip()
+        source = io.BytesIO(file_bytes) if isinstance(file_bytes, bytes) else file_bytes
+        text, stats = _extract_docx(source, max_chars or settings.RESUME_MAX_CHARS)
+        _log_stats(stats)
+        return text
     except Exception as e:
         print(f"DOCX extraction error: {e}")
         return ""
 
 
+def _log_stats(stats: ParseStats):
+    pages = f"{stats.pages_read}/{stats.pages_total} pages, " if stats.kind == "pdf" else ""
+    note = " (truncated)" if stats.truncated else ""
+    print(f"Parsed {stats.kind} in {stats.elapsed_ms:.1f}ms: {pages}{stats.chars} chars{note}")
+
+
 def parse_resume(file_bytes: bytes, content_type: str) -> str:
-    """Parse resume bytes based on content type."""
+    """
+    Parse resume bytes based on content type.
+    Extraction stops at RESUME_MAX_PAGES pages / about RESUME_MAX_CHARS characters, the most any
+    downstream consumer keeps (raw_text is stored truncated to 10k chars).
+    """
     if "pdf" in content_type.lower():
         return extract_text_from_pdf(file_bytes)
     elif "docx" in content_type.lower() or "word" in content_type.lower():
         return extract_text_from_docx(file_bytes)
     elif "plain" in content_type.lower():
-        return file_bytes.decode("utf-8", errors="ignore")
+        # UTF-8 is at most 4 bytes per char, so this slice always covers the char cap
+        return file_bytes[:settings.RESUME_MAX_CHARS * 4].decode("utf-8", errors="ignore")
     else:
         # Try PDF first, then DOCX
         text = extract_text_from_pdf(file_bytes)
@@ -59,21 +171,104 @@ def parse_resume(file_bytes: bytes, content_type: str) -> str:
         return text
 
 
-def estimate_experience_years(text: str) -> float:
-    """Estimate years of experience from resume text."""
-    patterns = [
-        r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-        r'experience\s*(?:of\s*)?(\d+)\+?\s*years?',
-        r'(\d+)\+?\s*yr[s]?\s*(?:of\s*)?(?:experience|exp)',
-    ]
-    for pattern in patterns:
-        matches = re.findall(pattern, text.lower())
-        if matches:
-            return float(max(int(m) for m in matches))
+def text_hash(text: str) -> str:
+    """Fingerprint of extracted text, insensitive to the whitespace differences re-exports introduce."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class _MappedFile(mmap.mmap):
+    """Read-only memory map that also satisfies the file protocol zipfile (python-docx) expects."""
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+
+def parse_resume_file(path: str, content_type: str) -> str:
+    """
+    Parse a resume that was spooled to disk without reading it into memory.
+    PDFs are opened by path, so MuPDF reads only the pages it extracts (and page-range
+    workers can reopen the file); DOCX and plain text read from a read-only memory map.
+    """
+    ctype = content_type.lower()
+    if "pdf" in ctype:
+        kind = "pdf"
+    elif "docx" in ctype or "word" in ctype:
+        kind = "docx"
+    elif "plain" in ctype:
+        kind = "plain"
+    else:
+        kind = None
+    with open(path, "rb") as f:
+        magic = f.read(5)
+        if not magic:
+            return ""
+        if kind is None:
+            # Unknown type: sniff the magic bytes instead of trying each parser in turn
+            kind = "pdf" if magic == b"%PDF-" else "docx" if magic[:2] == b"PK" else None
+        if kind == "pdf":
+            return extract_text_from_pdf(path)
+        if kind is None:
+            return ""
+        with _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            if kind == "plain":
+                return view[:settings.RESUME_MAX_CHARS * 4].decode("utf-8", errors="ignore")
+            return extract_text_from_docx(view)
+
+
+class ResumeFeatures(NamedTuple):
+    experience_years: float
+    education_level: str
+    industry: str
+    seniority: str
+
+
+# Highest level first; the first level with any keyword present wins
+EDUCATION_KEYWORDS = {
+    "phd": ['ph.d', 'phd', 'doctorate', 'doctor of philosophy'],
+    "masters": ['master', 'm.s.', 'mba', 'm.b.a', 'm.sc', 'msc', 'ms '],
+    "bachelors": ['bachelor', 'b.s.', 'b.a.', 'b.sc', 'bsc', 'b.e.', 'b.tech', 'btech', 'undergraduate'],
+    "associate": ['associate', 'diploma', 'a.s.', 'a.a.'],
+}
+
+INDUSTRY_KEYWORDS = {
+    "technology": ['software', 'developer', 'engineer', 'programming', 'coding', 'tech', 'it ', 'data science', 'machine learning', 'ai ', 'artificial intelligence', 'cloud', 'devops', 'frontend', 'backend', 'fullstack'],
+    "finance": ['finance', 'banking', 'investment', 'accounting', 'financial', 'cfa', 'cpa', 'audit', 'tax'],
+    "healthcare": ['healthcare', 'medical', 'hospital', 'clinical', 'pharmacy', 'nurse', 'doctor', 'physician'],
+    "marketing": ['marketing', 'seo', 'content', 'brand', 'digital marketing', 'social media', 'advertising'],
+    "education": ['teaching', 'teacher', 'professor', 'lecturer', 'education', 'university', 'school', 'tutor'],
+    "design": ['design', 'ui/ux', 'ux', 'graphic', 'creative', 'figma', 'adobe', 'illustrator'],
+    "sales": ['sales', 'business development', 'account manager', 'crm', 'revenue'],
+}
+
+EXECUTIVE_KEYWORDS = ['cto', 'ceo', 'coo', 'chief', 'vp ', 'vice president', 'director']
+SENIOR_KEYWORDS = ['senior', 'lead', 'principal', 'staff', 'architect']
+MID_KEYWORDS = ['mid', 'intermediate']
+
+# "N years of experience" and "N yrs exp" start with a digit run, which the regex engine can
+# only find by attempting a match at every position. Matched against the reversed text they
+# start with a literal instead, which is located with a fast substring search. Each reversed
+# pattern captures exactly the numbers the forward pattern would (reversed).
+_YEARS_OF_EXPERIENCE_REV = re.compile(r'ecneirepxe\s*(?:fo\s*)?s?raey\s*\+?(\d+)')  # N years (of) experience
+_EXPERIENCE_OF_YEARS = re.compile(r'experience\s*(?:of\s*)?(\d+)\+?\s*years?')     # experience (of) N years
+_YRS_OF_EXP_REV = re.compile(r'pxe\s*(?:fo\s*)?s?ry\s*\+?(\d+)')                    # N yrs (of) exp(erience)
+_YEAR_RANGE = re.compile(r'(20\d{2})\s*[-–]\s*(20\d{2}|present|current)')
+
+
+def _experience_years(text_lower: str) -> float:
+    reversed_text = text_lower[::-1]
+    years = [int(m[::-1]) for m in _YEARS_OF_EXPERIENCE_REV.findall(reversed_text)]
+    if not years:
+        years = [int(m) for m in _EXPERIENCE_OF_YEARS.findall(text_lower)]
+    if not years:
+        years = [int(m[::-1]) for m in _YRS_OF_EXP_REV.findall(reversed_text)]
+    if years:
+        return float(max(years))
 
     # Count year ranges like 2020 - 2023
-    year_pattern = r'(20\d{2})\s*[-–]\s*(20\d{2}|present|current)'
-    matches = re.findall(year_pattern, text.lower())
+    matches = _YEAR_RANGE.findall(text_lower)
     if matches:
         total = 0
         for start, end in matches:
@@ -85,47 +280,64 @@ def estimate_experience_years(text: str) -> float:
     return 0.0
 
 
-def detect_education_level(text: str) -> str:
-    """Detect highest education level from resume text."""
-    text_lower = text.lower()
-    if any(w in text_lower for w in ['ph.d', 'phd', 'doctorate', 'doctor of philosophy']):
-        return "phd"
-    if any(w in text_lower for w in ['master', 'm.s.', 'mba', 'm.b.a', 'm.sc', 'msc', 'ms ']):
-        return "masters"
-    if any(w in text_lower for w in ['bachelor', 'b.s.', 'b.a.', 'b.sc', 'bsc', 'b.e.', 'b.tech', 'btech', 'undergraduate']):
-        return "bachelors"
-    if any(w in text_lower for w in ['associate', 'diploma', 'a.s.', 'a.a.']):
-        return "associate"
+def _education_level(text_lower: str) -> str:
+    for level, keywords in EDUCATION_KEYWORDS.items():
+        if any(w in text_lower for w in keywords):
+            return level
     return "other"
 
 
-def detect_industry(text: str) -> str:
-    """Detect primary industry from resume text."""
-    text_lower = text.lower()
-    industries = {
-        "technology": ['software', 'developer', 'engineer', 'programming', 'coding', 'tech', 'it ', 'data science', 'machine learning', 'ai ', 'artificial intelligence', 'cloud', 'devops', 'frontend', 'backend', 'fullstack'],
-        "finance": ['finance', 'banking', 'investment', 'accounting', 'financial', 'cfa', 'cpa', 'audit', 'tax'],
-        "healthcare": ['healthcare', 'medical', 'hospital', 'clinical', 'pharmacy', 'nurse', 'doctor', 'physician'],
-        "marketing": ['marketing', 'seo', 'content', 'brand', 'digital marketing', 'social media', 'advertising'],
-        "education": ['teaching', 'teacher', 'professor', 'lecturer', 'education', 'university', 'school', 'tutor'],
-        "design": ['design', 'ui/ux', 'ux', 'graphic', 'creative', 'figma', 'adobe', 'illustrator'],
-        "sales": ['sales', 'business development', 'account manager', 'crm', 'revenue'],
+def _industry(text_lower: str) -> str:
+    scores = {
+        industry: sum(1 for kw in keywords if kw in text_lower)
+        for industry, keywords in INDUSTRY_KEYWORDS.items()
     }
-    scores = {}
-    for industry, keywords in industries.items():
-        scores[industry] = sum(1 for kw in keywords if kw in text_lower)
     return max(scores, key=scores.get) if scores else "other"
 
 
-def detect_seniority(text: str, experience_years: float) -> str:
-    """Detect seniority level."""
-    text_lower = text.lower()
-    if any(w in text_lower for w in ['cto', 'ceo', 'coo', 'chief', 'vp ', 'vice president', 'director']):
+def _seniority(text_lower: str, experience_years: float) -> str:
+    if any(w in text_lower for w in EXECUTIVE_KEYWORDS):
         return "executive"
-    if any(w in text_lower for w in ['senior', 'lead', 'principal', 'staff', 'architect']) or experience_years >= 5:
+    if any(w in text_lower for w in SENIOR_KEYWORDS) or experience_years >= 5:
         return "senior"
-    if any(w in text_lower for w in ['mid', 'intermediate']) or 2 <= experience_years < 5:
+    if any(w in text_lower for w in MID_KEYWORDS) or 2 <= experience_years < 5:
         return "mid"
     if experience_years < 2:
         return "junior"
     return "mid"
+
+
+def analyze_resume_text(text: str) -> ResumeFeatures:
+    """
+    Derive experience, education, industry and seniority from resume text in one call.
+    The text is lowercased once and shared by every detector; results are identical to
+    calling the individual detect_* functions.
+    """
+    text_lower = text.lower()
+    experience_years = _experience_years(text_lower)
+    return ResumeFeatures(
+        experience_years=experience_years,
+        education_level=_education_level(text_lower),
+        industry=_industry(text_lower),
+        seniority=_seniority(text_lower, experience_years),
+    )
+
+
+def estimate_experience_years(text: str) -> float:
+    """Estimate years of experience from resume text."""
+    return _experience_years(text.lower())
+
+
+def detect_education_level(text: str) -> str:
+    """Detect highest education level from resume text."""
+    return _education_level(text.lower())
+
+
+def detect_industry(text: str) -> str:
+    """Detect primary industry from resume text."""
+    return _industry(text.lower())
+
+
+def detect_seniority(text: str, experience_years: float) -> str:
+    """Detect seniority level."""
+    return _seniority(text.lower(), experience_years)
@@ -0,0 +1,86 @@
+import threading
+from typing import Dict, Optional, Set, Tuple
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.scoring_profiles import JobProfile, ResumeProfile
+
+ScoreKey = Tuple[str, Optional[str], str, Optional[str]]
+
+
+class ScoreCache:
+    """
+    Compatibility scores keyed by (resume id, resume version, job id, job version).
+    A new resume upload or job edit changes the version and so misses naturally;
+    the side indexes additionally let callers drop every entry for a resume, user or job.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = LRUCache(max_size, ttl_seconds)
+        self._by_resume: Dict[str, Set[ScoreKey]] = {}
+        self._by_job: Dict[str, Set[ScoreKey]] = {}
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(rp: ResumeProfile, jp: JobProfile) -> ScoreKey | None:
+        if rp.resume_id is None or jp.job_id is None:
+            return None
+        return (rp.resume_id, rp.version, jp.job_id, jp.version)
+
+    def get(self, rp: ResumeProfile, jp: JobProfile) -> Dict[str, int] | None:
+        key = self._key(rp, jp)
+        if key is None:
+            return None
+        score = self._cache.get(key)
+        return dict(score) if score is not None else None
+
+    def set(self, rp: ResumeProfile, jp: JobProfile, score: Dict[str, int]) -> None:
+        key = self._key(rp, jp)
+        if key is None:
+            return
+        self._cache.set(key, dict(score))
+        with self._lock:
+            self._by_resume.setdefault(rp.resume_id, set()).add(key)
+            self._by_job.setdefault(jp.job_id, set()).add(key)
+            if rp.user_id is not None:
+                self._by_user.setdefault(rp.user_id, set()).add(rp.resume_id)
+            if len(self._by_resume) + len(self._by_job) > 4 * self._cache.max_size:
+                self._compact()
+
+    def _compact(self) -> None:
+        """Drop side-index entries whose cache entries were already evicted."""
+        live = set(self._cache.keys())
+        for index in (self._by_resume, self._by_job):
+            for owner in list(index):
+                index[owner] &= live
+                if not index[owner]:
+                    del index[owner]
+        for user_id in list(self._by_user):
+            self._by_user[user_id] &= self._by_resume.keys()
+            if not self._by_user[user_id]:
+                del self._by_user[user_id]
+
+    def invalidate_resume(self, resume_id: str) -> None:
+        with self._lock:
+            keys = self._by_resume.pop(resume_id, set())
+        for key in keys:
+            self._cache.pop(key)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop scores for every resume of a user, e.g. when they upload a new one."""
+        with self._lock:
+            resume_ids = self._by_user.pop(user_id, set())
+        for resume_id in resume_ids:
+            self.invalidate_resume(resume_id)
+
+    def invalidate_job(self, job_id: str) -> None:
+        with self._lock:
+            keys = self._by_job.pop(job_id, set())
+        for key in keys:
+            self._cache.pop(key)
+
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats()
+
+
+score_cache = ScoreCache(settings.SCORE_CACHE_SIZE, settings.SCORE_CACHE_TTL_SECONDS)
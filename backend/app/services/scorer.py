@@ -1,5 +1,11 @@
-from typing import List, Dict, Tuple
+from typing import Any, List, Dict, Tuple
+import numpy as np
+from app.services.bm25_index import job_index, tokenize
 from app.services.embedder import compute_cosine_similarity
+from app.services.score_cache import score_cache
+from app.services.scoring_profiles import (
+    EDU_LEVELS, JobProfile, ResumeProfile, get_job_profile, get_resume_profile
+)
 
 
 def _clamp(value: float, min_val: float = 0.0, max_val: float = 100.0) -> int:
@@ -52,16 +58,15 @@ def compute_experience_match(user_years: float, job_min: float, job_max: float)
 
 def compute_keyword_similarity(resume_text: str, job_description: str,
                                 resume_emb: List[float], job_emb: List[float]) -> int:
-    """Calculate keyword similarity using dense (embeddings) and sparse (TF-IDF/BM25 approx) hybrid search."""
+    """Calculate keyword similarity using dense (embeddings) and sparse (BM25) hybrid search."""
     dense_score = 0
     sparse_score = 0
     
-    # 1. Sparse Search (Exact Keyword / BM25 Approximation)
-    resume_words = set(resume_text.lower().split())
-    job_words = set(job_description.lower().split())
-    if job_words:
-        overlap = len(resume_words & job_words) / len(job_words)
-        sparse_score = _clamp(overlap * 130) # Scale up slightly
+    # 1. Sparse Search (BM25 against the active-jobs corpus statistics)
+    job_tokens = tokenize(job_description)
+    if job_tokens:
+        ratio = job_index.score_tokens(tokenize(resume_text), job_tokens)
+        sparse_score = _clamp(ratio * 130) # Scale up slightly
         
     # 2. Dense Search (AI Semantic Embeddings via Cosine Similarity)
     if resume_emb and job_emb and any(v != 0 for v in resume_emb):
@@ -77,9 +82,8 @@ def compute_keyword_similarity(resume_text: str, job_description: str,
 
 def compute_education_match(user_edu: str, job_edu: str) -> int:
     """Calculate education match score."""
-    edu_levels = {"other": 0, "associate": 1, "bachelors": 2, "masters": 3, "phd": 4}
-    user_level = edu_levels.get(user_edu, 0)
-    job_level = edu_levels.get(job_edu, 0)
+    user_level = EDU_LEVELS.get(user_edu, 0)
+    job_level = EDU_LEVELS.get(job_edu, 0)
     if user_level >= job_level:
         return 100
     diff = job_level - user_level
@@ -144,3 +148,129 @@ def compute_compatibility_score(
         "education_match": education,
         "industry_alignment": industry,
     }
+
+
+def index_job(job: Dict[str, Any] | JobProfile) -> bool:
+    """
+    Keep the BM25 job index in sync with a job row. Called when a job is created or updated
+    and by the periodic index sync; inactive jobs are dropped. Returns True if the job is indexed.
+    """
+    jp = get_job_profile(job)
+    if jp.job_id is None:
+        return False
+    if not jp.active or not jp.tokens:
+        job_index.remove(jp.job_id)
+        if not jp.active:
+            score_cache.invalidate_job(jp.job_id)
+        return False
+    job_index.add(jp.job_id, jp.tokens, jp.version)
+    return True
+
+
+def score_jobs(
+    resume: Dict[str, Any] | ResumeProfile,
+    jobs: List[Dict[str, Any] | JobProfile],
+) -> List[Dict[str, int]]:
+    """
+    Score one resume against many jobs in a single pass.
+    Accepts raw rows or precompiled profiles; rows are turned into (cached) profiles so the
+    skill/token/embedding preprocessing happens once per resume or job version, and pairs
+    already in the score cache are not recomputed. The sparse keyword half is a single
+    query against the BM25 job index, job embeddings are stacked for one matmul and the
+    other components are computed as arrays.
+    """
+    if not jobs:
+        return []
+
+    rp = get_resume_profile(resume)
+    all_jps = [get_job_profile(job) for job in jobs]
+    results: List[Dict[str, int] | None] = [score_cache.get(rp, jp) for jp in all_jps]
+    missing = [i for i, cached in enumerate(results) if cached is None]
+    if missing:
+        fresh = _score_profiles(rp, [all_jps[i] for i in missing])
+        for i, score in zip(missing, fresh):
+            score_cache.set(rp, all_jps[i], score)
+            results[i] = score
+    return results
+
+
+def _score_profiles(rp: ResumeProfile, jps: List[JobProfile]) -> List[Dict[str, int]]:
+    n = len(jps)
+
+    # Skill match: only set lookups, weights were precomputed on the job profile
+    skill = np.empty(n, dtype=np.int64)
+    for i, jp in enumerate(jps):
+        if not jp.skills:
+            skill[i] = 50
+        elif not rp.has_skills or jp.total_skill_weight == 0:
+            skill[i] = 0
+        else:
+            matched = sum(w for s, w in jp.skill_weights if s in rp.skills)
+            skill[i] = _clamp(matched / jp.total_skill_weight * 100)
+
+    # Experience match
+    user_years = rp.experience_years
+    mins = np.array([jp.experience_min for jp in jps])
+    maxs = np.array([jp.experience_max for jp in jps])
+    under = np.clip(100 - np.minimum((mins - user_years) * 15, 80), 0, 100)
+    over = np.clip(100 - np.minimum((user_years - maxs) * 5, 20), 0, 100)
+    experience = np.where(
+        (user_years >= mins) & (user_years <= maxs), 100,
+        np.where(user_years < mins, under, over),
+    ).astype(np.int64)
+
+    # Keyword similarity: one BM25 query for the whole batch plus dense cosine via one matmul.
+    # Scoring only reads the index: jobs it does not hold at this version are scored against
+    # the corpus statistics instead.
+    indexed = {jp.job_id for jp in jps if jp.job_id is not None and job_index.is_current(jp.job_id, jp.version)}
+    ratios = job_index.query(rp.tokens, indexed) if indexed else {}
+    sparse = np.zeros(n, dtype=np.int64)
+    for i, jp in enumerate(jps):
+        if jp.job_id in indexed:
+            ratio = ratios.get(jp.job_id, 0.0)
+        elif jp.tokens:
+            ratio = job_index.score_tokens(rp.tokens, jp.tokens)
+        else:
+            ratio = 0.0
+        sparse[i] = _clamp(ratio * 130)
+
+    dense = np.zeros(n, dtype=np.int64)
+    if rp.embedding is not None:
+        rows = [i for i, jp in enumerate(jps)
+                if jp.embedding is not None and jp.embedding.shape == rp.embedding.shape]
+        if rows:
+            sims = np.vstack([jps[i].embedding for i in rows]) @ rp.embedding
+            dense[rows] = np.clip(sims.astype(np.float64) * 100, 0, 100).astype(np.int64)
+    keyword = np.where(
+        dense > 0, np.clip(dense * 0.70 + sparse * 0.30, 0, 100).astype(np.int64), sparse
+    )
+
+    # Education match
+    job_levels = np.array([jp.education_code for jp in jps])
+    education = np.where(
+        rp.education_code >= job_levels, 100, np.clip(100 - (job_levels - rp.education_code) * 25, 0, 100)
+    ).astype(np.int64)
+
+    # Industry alignment
+    industry = np.array([compute_industry_alignment(rp.industry, jp.industry) for jp in jps], dtype=np.int64)
+
+    total = np.clip(
+        skill * 0.40 + experience * 0.25 + keyword * 0.20 + education * 0.10 + industry * 0.05, 0, 100
+    ).astype(np.int64)
+
+    return [
+        {
+            "total_score": int(total[i]),
+            "skill_match": int(skill[i]),
+            "experience_match": int(experience[i]),
+            "keyword_similarity": int(keyword[i]),
+            "education_match": int(education[i]),
+            "industry_alignment": int(industry[i]),
+        }
+        for i in range(n)
+    ]
+
+
+def score_pair(resume: Dict[str, Any] | ResumeProfile, job: Dict[str, Any] | JobProfile) -> Dict[str, int]:
+    """Compatibility score for a single resume/job pair using precompiled profiles."""
+    return score_jobs(resume, [job])[0]
@@ -0,0 +1,162 @@
+import json
+from typing import Any, Dict, FrozenSet, Tuple
+import numpy as np
+from app.core.cache import LRUCache
+from app.services.bm25_index import tokenize
+
+EDU_LEVELS = {"other": 0, "associate": 1, "bachelors": 2, "masters": 3, "phd": 4}
+
+
+def _as_vector(value: Any) -> np.ndarray | None:
+    """Embeddings come back from PostgREST either as float arrays or as pgvector text ('[0.1,...]')."""
+    if value is None or len(value) == 0:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return np.asarray(value, dtype=np.float64)
+
+
+def _unit_float32(value: Any) -> np.ndarray | None:
+    """Pre-normalized float32 copy of an embedding, or None if missing or all zeros."""
+    vec = _as_vector(value)
+    if vec is None:
+        return None
+    norm = np.linalg.norm(vec)
+    if norm == 0:
+        return None
+    unit = (vec / norm).astype(np.float32)
+    unit.setflags(write=False)
+    return unit
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+
+class ResumeProfile(_Frozen):
+    """Scoring inputs for one resume, normalized once so repeated scoring does no string work."""
+
+    __slots__ = ("resume_id", "user_id", "version", "skills", "has_skills", "experience_years",
+                 "education_code", "industry", "tokens", "embedding")
+
+    resume_id: str | None
+    user_id: str | None
+    version: str | None
+    skills: FrozenSet[str]
+    has_skills: bool
+    experience_years: float
+    education_code: int
+    industry: str
+    tokens: FrozenSet[str]
+    embedding: np.ndarray | None
+
+    def __init__(self, row: Dict[str, Any]):
+        skills = row.get("skills") or []
+        set_ = object.__setattr__
+        set_(self, "resume_id", row.get("id"))
+        set_(self, "user_id", row.get("user_id"))
+        set_(self, "version", row.get("updated_at") or row.get("created_at"))
+        set_(self, "skills", frozenset(s.lower().strip() for s in skills))
+        set_(self, "has_skills", bool(skills))
+        set_(self, "experience_years", float(row.get("experience_years") or 0))
+        set_(self, "education_code", EDU_LEVELS.get(row.get("education_level") or "other", 0))
+        set_(self, "industry", row.get("industry") or "")
+        set_(self, "tokens", frozenset(tokenize(row.get("raw_text") or "")))
+        set_(self, "embedding", _unit_float32(row.get("embedding")))
+
+
+class JobProfile(_Frozen):
+    """Scoring inputs for one job, including title-weighted skills, normalized once."""
+
+    __slots__ = ("job_id", "version", "active", "skills", "skill_weights", "total_skill_weight",
+                 "experience_min", "experience_max", "education_code", "industry",
+                 "tokens", "embedding")
+
+    job_id: str | None
+    version: str | None
+    active: bool
+    skills: FrozenSet[str]
+    skill_weights: Tuple[Tuple[str, int], ...]
+    total_skill_weight: int
+    experience_min: float
+    experience_max: float
+    education_code: int
+    industry: str
+    tokens: Tuple[str, ...]
+    embedding: np.ndarray | None
+
+    def __init__(self, row: Dict[str, Any]):
+        skills = frozenset(s.lower().strip() for s in (row.get("skills_required") or []))
+        title_lower = (row.get("title") or "").lower()
+        # Skills named in the title are core to the role and weigh 3x
+        weights = tuple((s, 3 if s in title_lower else 1) for s in skills)
+        set_ = object.__setattr__
+        set_(self, "job_id", row.get("id"))
+        set_(self, "version", row.get("updated_at") or row.get("created_at"))
+        set_(self, "active", (row.get("status") or "active") == "active")
+        set_(self, "skills", skills)
+        set_(self, "skill_weights", weights)
+        set_(self, "total_skill_weight", sum(w for _, w in weights))
+        set_(self, "experience_min", float(row.get("experience_min") or 0))
+        # 0 is a real maximum (entry-level roles); only a missing value defaults to 10
+        experience_max = row.get("experience_max")
+        set_(self, "experience_max", float(10 if experience_max is None else experience_max))
+        set_(self, "education_code", EDU_LEVELS.get(row.get("education_level") or "other", 0))
+        set_(self, "industry", row.get("industry") or "")
+        # Kept as a sequence (not a set) because BM25 needs term frequencies
+        set_(self, "tokens", tuple(tokenize(row.get("description") or "")))
+        set_(self, "embedding", _unit_float32(row.get("embedding")))
+
+
+# Every column JobProfile reads; select these when loading jobs only to build profiles
+JOB_PROFILE_COLUMNS = (
+    "id, title, description, skills_required, experience_min, experience_max, "
+    "education_level, industry, status, embedding, created_at, updated_at"
+)
+
+_resume_profiles = LRUCache(max_size=1024)
+_job_profiles = LRUCache(max_size=4096)
+
+
+def _cached(cache: LRUCache, cls, row: Dict[str, Any]):
+    row_id = row.get("id")
+    if row_id is None:
+        return cls(row)
+    key = (row_id, row.get("updated_at") or row.get("created_at"))
+    profile = cache.get(key)
+    if profile is None:
+        profile = cls(row)
+        cache.set(key, profile)
+    return profile
+
+
+def get_resume_profile(row: Dict[str, Any] | ResumeProfile) -> ResumeProfile:
+    """Return the cached profile for this resume row version, building it on first use."""
+    if isinstance(row, ResumeProfile):
+        return row
+    return _cached(_resume_profiles, ResumeProfile, row)
+
+
+def get_job_profile(row: Dict[str, Any] | JobProfile) -> JobProfile:
+    """Return the cached profile for this job row version, building it on first use."""
+    if isinstance(row, JobProfile):
+        return row
+    return _cached(_job_profiles, JobProfile, row)
+
+
+def peek_job_profile(row: Dict[str, Any]) -> JobProfile | None:
+    """The cached profile for this job row version, if any. Never builds one, so partial rows are safe to pass."""
+    return _job_profiles.get((row.get("id"), row.get("updated_at") or row.get("created_at")))
+
+
+def profile_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {"resume_profiles": _resume_profiles.stats(), "job_profiles": _job_profiles.stats()}
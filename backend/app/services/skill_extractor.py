@@ -1,98 +1,136 @@
-from typing import List, Set
-import re
-
-# Comprehensive skill keyword database
-SKILLS_DB = {
-    # Programming Languages
-    "python", "javascript", "typescript", "java", "c++", "c#", "go", "rust", "ruby", "php",
-    "swift", "kotlin", "scala", "r", "matlab", "perl", "bash", "shell scripting",
-    # Frontend
-    "react", "next.js", "vue", "angular", "svelte", "html", "css", "tailwind", "sass",
-    "redux", "zustand", "graphql", "webpack", "vite", "jquery", "bootstrap",
-    # Backend
-    "node.js", "express", "fastapi", "django", "flask", "spring boot", "laravel",
-    "rails", "asp.net", "nestjs", "hapi",
-    # Databases
-    "postgresql", "mysql", "mongodb", "redis", "sqlite", "elasticsearch", "cassandra",
-    "dynamodb", "firestore", "supabase", "oracle", "sql server",
-    # Cloud & DevOps
-    "aws", "azure", "gcp", "google cloud", "docker", "kubernetes", "terraform", "ansible",
-    "jenkins", "github actions", "ci/cd", "linux", "nginx", "apache",
-    # AI / ML
-    "machine learning", "deep learning", "tensorflow", "pytorch", "scikit-learn",
-    "hugging face", "langchain", "openai", "nlp", "computer vision", "llm",
-    "data science", "pandas", "numpy", "matplotlib", "seaborn",
-    # Mobile
-    "react native", "flutter", "android", "ios", "swift", "xcode",
-    # Tools & Practices
-    "git", "github", "jira", "agile", "scrum", "rest api", "microservices",
-    "unit testing", "tdd", "figma", "photoshop", "illustrator",
-    # Soft Skills
-    "leadership", "communication", "teamwork", "problem solving", "project management",
-    "critical thinking", "time management",
-    # Business
-    "excel", "power bi", "tableau", "sql", "salesforce", "hubspot", "seo", "google analytics",
-}
-
-# Map to canonical names
-SKILL_ALIASES = {
-    "react.js": "react",
-    "reactjs": "react",
-    "nodejs": "node.js",
-    "nextjs": "next.js",
-    "vuejs": "vue",
-    "angular.js": "angular",
-    "postgres": "postgresql",
-    "mongo": "mongodb",
-    "k8s": "kubernetes",
-    "tf": "tensorflow",
-    "sklearn": "scikit-learn",
-    "ml": "machine learning",
-    "dl": "deep learning",
-    "ai": "artificial intelligence",
-}
-
-
-def _normalize(skill: str) -> str:
-    return SKILL_ALIASES.get(skill.lower().strip(), skill.lower().strip())
+import json
+import os
+import threading
+import time
+from typing import Dict, FrozenSet, List, NamedTuple, Set, Tuple
+from app.core.config import settings
+from app.services.keyword_matcher import KeywordMatcher
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills_taxonomy.json")
+
+
+class Taxonomy(NamedTuple):
+    version: str
+    skills: FrozenSet[str]
+    aliases: Dict[str, str]           # alias -> canonical name
+    in_demand: Dict[str, List[str]]   # industry -> in-demand skills
+    default_in_demand: List[str]
+    matcher: KeywordMatcher           # every skill and alias, compiled for single-pass matching
+    mtime: float
+
+
+class SkillMatch(NamedTuple):
+    skill: str      # canonical skill name
+    start: int      # offsets into the original text, for highlighting
+    end: int
+
+
+def load_taxonomy(path: str) -> Taxonomy:
+    """Read a taxonomy data file and compile it into the matcher."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    skills = frozenset(s.lower().strip() for s in data["skills"])
+    aliases = {k.lower().strip(): v.lower().strip() for k, v in data.get("aliases", {}).items()}
+    return Taxonomy(
+        version=str(data["version"]),
+        skills=skills,
+        aliases=aliases,
+        in_demand=data.get("in_demand", {}),
+        default_in_demand=data.get("default_in_demand", []),
+        matcher=KeywordMatcher(skills | aliases.keys()),
+        mtime=os.path.getmtime(path),
+    )
+
+
+_taxonomy_path = settings.SKILLS_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH
+_active: Taxonomy = load_taxonomy(_taxonomy_path)
+_last_check = time.monotonic()
+_failed_mtime: float | None = None
+_reload_lock = threading.Lock()
+
+
+def get_taxonomy() -> Taxonomy:
+    """
+    Return the active taxonomy, reloading it if the data file changed.
+    The new version is compiled by a single thread while everyone else keeps using the
+    current one, then swapped in with one reference assignment.
+    """
+    global _active, _last_check, _failed_mtime
+    now = time.monotonic()
+    if now - _last_check < settings.SKILLS_TAXONOMY_RELOAD_SECONDS:
+        return _active
+    if not _reload_lock.acquire(blocking=False):
+        return _active
+    mtime = None
+    try:
+        _last_check = now
+        mtime = os.path.getmtime(_taxonomy_path)
+        if mtime != _active.mtime and mtime != _failed_mtime:
+            taxonomy = load_taxonomy(_taxonomy_path)
+            print(f"Skills taxonomy reloaded: {_active.version} -> {taxonomy.version}")
+            _active = taxonomy
+    except Exception as e:
+        # Don't retry the same broken file on every check
+        _failed_mtime = mtime
+        print(f"Skills taxonomy reload failed, keeping version {_active.version}: {e}")
+    finally:
+        _reload_lock.release()
+    return _active
+
+
+def get_taxonomy_version() -> str:
+    return get_taxonomy().version
+
+
+def _normalize(skill: str, taxonomy: Taxonomy | None = None) -> str:
+    aliases = (taxonomy or get_taxonomy()).aliases
+    return aliases.get(skill.lower().strip(), skill.lower().strip())
+
+
+def find_skill_matches(text: str) -> List[SkillMatch]:
+    """Find every skill/alias occurrence in a single pass over the text, ordered by position."""
+    taxonomy = get_taxonomy()
+    matches = [
+        SkillMatch(taxonomy.aliases.get(m.term, m.term), m.start, m.end)
+        for m in taxonomy.matcher.finditer(text)
+    ]
+    matches.sort(key=lambda m: (m.start, m.end))
+    return matches
+
+
+def extract_skills_versioned(text: str) -> Tuple[List[str], str]:
+    """Extract skills and return them with the taxonomy version that produced them."""
+    taxonomy = get_taxonomy()
+    found: Set[str] = {taxonomy.aliases.get(term, term) for term in taxonomy.matcher.find_all(text)}
+    return sorted(found), taxonomy.version
 
 
 def extract_skills(text: str) -> List[str]:
     """Extract skills from resume text using keyword matching."""
-    text_lower = text.lower()
-    found: Set[str] = set()
-
-    for skill in SKILLS_DB:
-        # Use word boundary matching for short skills to avoid false positives
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(pattern, text_lower):
-            found.add(skill)
+    return extract_skills_versioned(text)[0]
 
-    # Check aliases
-    for alias, canonical in SKILL_ALIASES.items():
-        pattern = r'\b' + re.escape(alias) + r'\b'
-        if re.search(pattern, text_lower):
-            found.add(canonical)
 
-    return sorted(list(found))
+def canonicalize_skills(skills: List[str]) -> List[str]:
+    """Map skills to their canonical names, dropping duplicates but keeping the original order."""
+    taxonomy = get_taxonomy()
+    seen: Set[str] = set()
+    result = []
+    for skill in skills:
+        canonical = _normalize(skill, taxonomy)
+        if canonical and canonical not in seen:
+            seen.add(canonical)
+            result.append(canonical)
+    return result
 
 
 def get_missing_skills(user_skills: List[str], job_skills: List[str]) -> List[str]:
     """Return skills in job that are missing from user profile."""
-    user_set = {_normalize(s) for s in user_skills}
-    return [s for s in job_skills if _normalize(s) not in user_set]
+    taxonomy = get_taxonomy()
+    user_set = {_normalize(s, taxonomy) for s in user_skills}
+    return [s for s in job_skills if _normalize(s, taxonomy) not in user_set]
 
 
 def get_in_demand_skills(industry: str) -> List[str]:
     """Return in-demand skills for a given industry."""
-    demand_map = {
-        "technology": ["docker", "kubernetes", "aws", "react", "python", "typescript", "graphql",
-                       "machine learning", "ci/cd", "microservices"],
-        "finance": ["excel", "python", "sql", "tableau", "power bi", "bloomberg", "financial modeling"],
-        "marketing": ["seo", "google analytics", "hubspot", "content marketing", "social media", "figma"],
-        "healthcare": ["ehr", "medical coding", "clinical research", "hipaa", "python", "data analysis"],
-        "design": ["figma", "adobe xd", "photoshop", "illustrator", "ux research", "prototyping"],
-        "education": ["curriculum development", "lms", "e-learning", "communication", "python"],
-        "sales": ["salesforce", "crm", "hubspot", "negotiation", "communication", "excel"],
-    }
-    return demand_map.get(industry, ["python", "sql", "excel", "communication", "git"])
+    taxonomy = get_taxonomy()
+    return list(taxonomy.in_demand.get(industry, taxonomy.default_in_demand))
@@ -0,0 +1,206 @@
+"""
+Re-run skill and feature extraction over stored resumes and jobs.
+
+Use this after the skills taxonomy or the resume_parser heuristics change, instead of
+asking users to re-upload. Rows are paged by primary key (keyset pagination), extracted
+across a process pool and written back with one upsert per batch. Progress is
+checkpointed after every batch, so an interrupted run continues where it stopped.
+Rows whose derived fields change get a new updated_at (and, for resumes, a rebuilt digest),
+so running workers stop serving cached profiles, scores and LLM responses for the old values.
+Unchanged rows only have a stale taxonomy_version recorded, which does not count as an edit,
+and rows that are already current are not written at all.
+
+    python backfill_extraction.py --table all --workers 4
+    python backfill_extraction.py --table resumes --only-stale
+    python backfill_extraction.py --reset            # ignore the checkpoint, start over
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add current directory to path so we can import app modules
+sys.path.append(os.getcwd())
+
+from app.core.supabase import get_supabase_service_role
+from app.services.resume_digest import build_resume_digest
+from app.services.resume_parser import analyze_resume_text
+from app.services.skill_extractor import canonicalize_skills, extract_skills_versioned, get_taxonomy_version
+
+RESUME_COLUMNS = "id, user_id, raw_text, skills, experience_years, education_level, industry, seniority, digest, taxonomy_version"
+JOB_COLUMNS = "id, company_id, title, skills_required, taxonomy_version"
+RESUME_DERIVED_FIELDS = ("skills", "experience_years", "education_level", "industry", "seniority")
+
+
+def extract_resume(row: dict) -> tuple:
+    """
+    Worker: recompute every derived resume field from the stored raw text.
+    Returns (update, changed); an unchanged row only has its taxonomy version bumped,
+    and update is None when that is already current.
+    """
+    text = row.get("raw_text") or ""
+    skills, version = extract_skills_versioned(text)
+    features = analyze_resume_text(text)
+    update = {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "skills": skills,
+        "experience_years": features.experience_years,
+        "education_level": features.education_level,
+        "industry": features.industry,
+        "seniority": features.seniority,
+        "taxonomy_version": version,
+    }
+    if row.get("digest") and all(update[f] == row.get(f) for f in RESUME_DERIVED_FIELDS):
+        if row.get("taxonomy_version") == version:
+            return None, False
+        return {"id": row["id"], "user_id": row["user_id"], "taxonomy_version": version}, False
+    # The digest feeds LLM prompts, so it is rebuilt from the new fields
+    update["digest"] = build_resume_digest(
+        text, skills, features.experience_years, features.education_level, features.industry, features.seniority
+    )
+    return update, True
+
+
+def extract_job(row: dict) -> tuple:
+    """
+    Worker: map employer-entered skills onto the current taxonomy's canonical names.
+    Returns (update, changed); an unchanged row only has its taxonomy version bumped,
+    and update is None when that is already current.
+    """
+    skills = canonicalize_skills(row.get("skills_required") or [])
+    version = get_taxonomy_version()
+    changed = skills != (row.get("skills_required") or [])
+    if not changed and row.get("taxonomy_version") == version:
+        return None, False
+    update = {
+        "id": row["id"],
+        "company_id": row["company_id"],
+        "title": row["title"],
+        "taxonomy_version": version,
+    }
+    if changed:
+        update["skills_required"] = skills
+    return update, changed
+
+
+def write_updates(sb, table: str, results: list) -> int:
+    """
+    Upsert a batch, stamping updated_at on the rows whose derived fields changed so cached
+    profiles, scores and LLM responses keyed on (id, updated_at) miss. Changed and version-only
+    rows are separate upserts because every row of one upsert must carry the same columns.
+    Version-only rows keep their updated_at: resumes have no update trigger, and the jobs
+    trigger (database/14) ignores updates that only set taxonomy_version.
+    Returns the number of changed rows.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    changed = [dict(update, updated_at=now) for update, is_changed in results if is_changed]
+    unchanged = [update for update, is_changed in results if update is not None and not is_changed]
+    for group in (changed, unchanged):
+        if group:
+            sb.table(table).upsert(group).execute()
+    return len(changed)
+
+
+TABLES = {
+    "resumes": (RESUME_COLUMNS, extract_resume),
+    "jobs": (JOB_COLUMNS, extract_job),
+}
+
+
+def load_checkpoint(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    return {}
+
+
+def save_checkpoint(path: str, checkpoint: dict):
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def backfill_table(sb, pool, table: str, args, checkpoint: dict):
+    columns, extract = TABLES[table]
+    version = get_taxonomy_version()
+    state = checkpoint.setdefault(table, {})
+    last_id = state.get("last_id")
+    if last_id:
+        print(f"[{table}] resuming after id {last_id} ({state.get('rows', 0)} rows already done)")
+
+    started = time.monotonic()
+    processed = 0
+    changed = 0
+    while True:
+        query = sb.table(table).select(columns).order("id").limit(args.batch_size)
+        if last_id:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        todo = [r for r in rows if not (args.only_stale and r.get("taxonomy_version") == version)]
+        if todo:
+            results = list(pool.map(extract, todo, chunksize=max(1, len(todo) // (args.workers * 4))))
+            if args.dry_run:
+                changed += sum(1 for _, is_changed in results if is_changed)
+            else:
+                changed += write_updates(sb, table, results)
+        processed += len(todo)
+
+        state["last_id"] = last_id
+        state["rows"] = state.get("rows", 0) + len(todo)
+        if not args.dry_run:
+            save_checkpoint(args.checkpoint, checkpoint)
+
+        elapsed = time.monotonic() - started
+        print(f"[{table}] {processed} rows extracted ({changed} changed), {len(rows) - len(todo)} skipped in last batch, "
+              f"{processed / elapsed if elapsed else 0:.1f} rows/sec")
+
+    elapsed = time.monotonic() - started
+    state["done"] = True
+    if not args.dry_run:
+        save_checkpoint(args.checkpoint, checkpoint)
+    print(f"[{table}] finished: {processed} rows ({changed} changed) in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.1f} rows/sec)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run skill/feature extraction for stored resumes and jobs.")
+    parser.add_argument("--table", choices=["resumes", "jobs", "all"], default="all")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--checkpoint", default=".cache/backfill_checkpoint.json")
+    parser.add_argument("--only-stale", action="store_true", help="Skip rows already extracted with the current taxonomy version")
+    parser.add_argument("--reset", action="store_true", help="Ignore any existing checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Extract but do not write rows or checkpoints")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.checkpoint)), exist_ok=True)
+    checkpoint = {} if args.reset else load_checkpoint(args.checkpoint)
+    version = get_taxonomy_version()
+    if checkpoint.get("taxonomy_version") not in (None, version):
+        print(f"Checkpoint was written for taxonomy {checkpoint['taxonomy_version']}, starting over for {version}")
+        checkpoint = {}
+    checkpoint["taxonomy_version"] = version
+
+    sb = get_supabase_service_role()
+    tables = ["resumes", "jobs"] if args.table == "all" else [args.table]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for table in tables:
+            if checkpoint.get(table, {}).get("done"):
+                print(f"[{table}] already complete for taxonomy {version}, skipping (use --reset to redo)")
+                continue
+            backfill_table(sb, pool, table, args, checkpoint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Bulk-ingest resumes from a directory or a .zip archive (e.g. a partner's CV dump).
+
+Ingested CVs are candidates, not users: they are stored in the candidates table under a
+named source (candidate_sources), never as resumes of a profile, so no user's feed,
+analysis, roadmap or applications read them.
+
+Files flow through a staged pipeline with bounded queues between the stages, so memory
+stays flat however large the input is:
+
+    read  -> parse + extract (process pool) -> embed (batched) -> write (batched insert)
+
+Files whose content hash is already stored for the source are skipped, so a re-run
+after an interruption only ingests what is missing. LLM analysis is optional and is
+deferred until every row has been written (--analyze). If a stage fails, the other
+stages stop and the command exits non-zero, as it does when any file could not be
+ingested; re-running picks up the missing files.
+
+    python bulk_ingest.py cvs.zip --partner acme-2024-q3
+    python bulk_ingest.py ./cvs --partner acme-2024-q3 --workers 8 --analyze
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, List, Tuple
+from dotenv import load_dotenv
+load_dotenv()
+
+# Add current directory to path so we can import app modules
+sys.path.append(os.getcwd())
+
+from app.core.config import settings
+from app.core.supabase import get_supabase_service_role
+from app.services.embedder import get_embeddings
+from app.services.resume_analysis import analyze_resume
+from app.services.resume_digest import build_resume_digest
+from app.services.resume_parser import analyze_resume_text, parse_resume, text_hash
+from app.services.skill_extractor import extract_skills_versioned
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".txt": "text/plain",
+}
+
+_DONE = object()  # end-of-stream marker passed between stages
+QUEUE_POLL_SECONDS = 0.5  # how often a blocked stage checks whether the pipeline was stopped
+
+
+class PipelineStopped(Exception):
+    """Raised in a stage when another stage failed and the pipeline is shutting down."""
+
+
+def put(q: queue.Queue, item, stop: threading.Event):
+    """Put onto a bounded queue, giving up if the pipeline is stopped while waiting for room."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=QUEUE_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+    raise PipelineStopped()
+
+
+def get(q: queue.Queue, stop: threading.Event):
+    """Take from a queue, giving up if the pipeline is stopped while waiting for input."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    raise PipelineStopped()
+
+
+def run_stage(name: str, target, stop: threading.Event, errors: List[str], *args):
+    """Thread body: run a stage, and on failure record it and stop every other stage."""
+    try:
+        target(*args, stop)
+    except PipelineStopped:
+        pass
+    except Exception as e:
+        errors.append(f"{name} stage failed: {e!r}")
+        print(errors[-1])
+        stop.set()
+
+
+class StageStats:
+    """Items and busy time for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, seconds: float):
+        with self._lock:
+            self.items += items
+            self.busy += seconds
+
+    def report(self, wall: float) -> str:
+        per_busy = self.items / self.busy if self.busy else 0.0
+        per_wall = self.items / wall if wall else 0.0
+        return (f"  {self.name:<8} {self.items:>7} items  busy {self.busy:7.1f}s  "
+                f"{per_busy:8.1f}/s busy  {per_wall:8.1f}/s wall")
+
+
+def iter_sources(path: str) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, bytes) for every supported file in a directory tree or zip archive."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and os.path.splitext(info.filename)[1].lower() in CONTENT_TYPES:
+                    yield info.filename, archive.read(info)
+        return
+    for root, _, files in os.walk(path):
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() in CONTENT_TYPES:
+                full_path = os.path.join(root, filename)
+                with open(full_path, "rb") as f:
+                    yield os.path.relpath(full_path, path), f.read()
+
+
+def parse_and_extract(name: str, data: bytes, content_hash: str) -> dict:
+    """Worker: parse one file and derive every field except the embedding."""
+    started = time.perf_counter()
+    content_type = CONTENT_TYPES[os.path.splitext(name)[1].lower()]
+    try:
+        raw_text = parse_resume(data, content_type)
+    except Exception as e:
+        return {"name": name, "error": str(e), "elapsed": time.perf_counter() - started}
+    if not raw_text:
+        return {"name": name, "error": "no text extracted", "elapsed": time.perf_counter() - started}
+
+    skills, taxonomy_version = extract_skills_versioned(raw_text)
+    features = analyze_resume_text(raw_text)
+    return {
+        "name": name,
+        "elapsed": time.perf_counter() - started,
+        "row": {
+            "file_name": name,
+            "raw_text": raw_text[:10000],
+            "skills": skills,
+            "experience_years": features.experience_years,
+            "education_level": features.education_level,
+            "industry": features.industry,
+            "seniority": features.seniority,
+            "taxonomy_version": taxonomy_version,
+            "content_hash": content_hash,
+            "text_hash": text_hash(raw_text),
+            "digest": build_resume_digest(
+                raw_text, skills, features.experience_years, features.education_level,
+                features.industry, features.seniority,
+            ),
+        },
+    }
+
+
+def resolve_source(sb, name: str) -> str:
+    """Id of the named candidate source, created on first use."""
+    result = sb.table("candidate_sources").upsert({"name": name}, on_conflict="name").execute()
+    return result.data[0]["id"]
+
+
+def load_known_hashes(sb, source_id: str, page_size: int = 1000) -> set:
+    """Content hashes already ingested from this source, paged by primary key."""
+    known = set()
+    last_id = None
+    while True:
+        query = sb.table("candidates").select("id, content_hash").eq("source_id", source_id).order("id").limit(page_size)
+        if last_id:
+            query = query.gt("id", last_id)
+        rows = query.execute().data or []
+        if not rows:
+            return known
+        known.update(r["content_hash"] for r in rows if r.get("content_hash"))
+        last_id = rows[-1]["id"]
+
+
+def embed_stage(inbox: queue.Queue, outbox: queue.Queue, batch_size: int, stats: StageStats, stop: threading.Event):
+    """Thread: embed parsed rows in batches, then pass them on to the writer."""
+    batch: List[dict] = []
+
+    def flush():
+        started = time.perf_counter()
+        embeddings = get_embeddings([row["raw_text"][:2000] for row in batch])
+        for row, embedding in zip(batch, embeddings):
+            row["embedding"] = embedding
+        stats.record(len(batch), time.perf_counter() - started)
+        put(outbox, list(batch), stop)
+        batch.clear()
+
+    while (row := get(inbox, stop)) is not _DONE:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    put(outbox, _DONE, stop)
+
+
+def write_stage(sb, inbox: queue.Queue, args, source_id: str, stats: StageStats, written: List[dict],
+                failed: List[dict], stop: threading.Event):
+    """
+    Thread: insert embedded rows in batches of --batch-size. Rows of a failed insert are
+    collected in `failed` (the run then exits non-zero); the next batches still go in.
+    """
+    pending: List[dict] = []
+
+    def flush():
+        started = time.perf_counter()
+        if args.dry_run:
+            inserted = pending
+        else:
+            try:
+                inserted = sb.table("candidates").insert(pending).execute().data or []
+            except Exception as e:
+                print(f"Insert of {len(pending)} rows failed: {e}")
+                failed.extend(pending)
+                inserted = []
+        written.extend(inserted)
+        stats.record(len(inserted), time.perf_counter() - started)
+        pending.clear()
+
+    while (rows := get(inbox, stop)) is not _DONE:
+        for row in rows:
+            row["source_id"] = source_id
+            pending.append(row)
+        if len(pending) >= args.batch_size:
+            flush()
+    if pending:
+        flush()
+
+
+async def analyze_rows(sb, rows: List[dict], concurrency: int, stats: StageStats):
+    """Deferred LLM analysis of the ingested candidates, a few requests at a time. Token usage is logged without a user."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze(row: dict):
+        async with semaphore:
+            started = time.perf_counter()
+            analysis = await analyze_resume(
+                sb, None, row["raw_text"], row["skills"], row["experience_years"],
+                row["education_level"], row["industry"], row["seniority"], endpoint="bulk_ingest",
+                digest=row["digest"],
+            )
+            sb.table("candidate_analysis").insert({"candidate_id": row["id"], **analysis}).execute()
+            stats.record(1, time.perf_counter() - started)
+
+    await asyncio.gather(*(analyze(row) for row in rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes from a directory or zip archive.")
+    parser.add_argument("source", help="Directory or .zip archive of .pdf/.docx/.txt resumes")
+    parser.add_argument("--partner", required=True, help="Name of the partner or dump the CVs come from (created if new)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--queue-size", type=int, default=64, help="Max items waiting between stages")
+    parser.add_argument("--embed-batch", type=int, default=settings.EMBED_BATCH_SIZE)
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per insert")
+    parser.add_argument("--analyze", action="store_true", help="Run LLM analysis after all rows are written")
+    parser.add_argument("--analyze-concurrency", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true", help="Parse, extract and embed but do not write rows")
+    args = parser.parse_args()
+
+    sb = None if args.dry_run else get_supabase_service_role()
+    source_id = None if args.dry_run else resolve_source(sb, args.partner)
+    known = set() if args.dry_run else load_known_hashes(sb, source_id)
+    stats = {name: StageStats(name) for name in ("read", "parse", "embed", "write", "analyze")}
+    to_embed: queue.Queue = queue.Queue(maxsize=args.queue_size)
+    to_write: queue.Queue = queue.Queue(maxsize=max(1, args.queue_size // args.embed_batch))
+    written: List[dict] = []
+    write_failed: List[dict] = []
+    skipped = failed = 0
+    stop = threading.Event()
+    errors: List[str] = []
+
+    embedder = threading.Thread(target=run_stage, args=(
+        "embed", embed_stage, stop, errors, to_embed, to_write, args.embed_batch, stats["embed"]))
+    writer = threading.Thread(target=run_stage, args=(
+        "write", write_stage, stop, errors, sb, to_write, args, source_id, stats["write"], written, write_failed))
+    embedder.start()
+    writer.start()
+
+    def collect(done):
+        nonlocal skipped, failed
+        for future in done:
+            result = future.result()
+            stats["parse"].record(1, result["elapsed"])
+            if "error" in result:
+                failed += 1
+                print(f"Skipping {result['name']}: {result['error']}")
+                continue
+            if result["row"]["content_hash"] in known:
+                skipped += 1  # same file listed twice in this run
+                continue
+            known.add(result["row"]["content_hash"])
+            put(to_embed, result["row"], stop)  # blocks while the embed stage is behind
+
+    started = time.monotonic()
+    in_flight = set()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            try:
+                sources = iter_sources(args.source)
+                while not stop.is_set():
+                    read_started = time.perf_counter()
+                    item = next(sources, None)
+                    if item is None:
+                        break
+                    name, data = item
+                    stats["read"].record(1, time.perf_counter() - read_started)
+                    content_hash = hashlib.sha256(data).hexdigest()
+                    if content_hash in known:
+                        skipped += 1
+                        continue
+                    in_flight.add(pool.submit(parse_and_extract, name, data, content_hash))
+                    if len(in_flight) >= args.queue_size:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                if not stop.is_set():
+                    collect(wait(in_flight).done)
+            finally:
+                pool.shutdown(cancel_futures=True)
+        put(to_embed, _DONE, stop)
+    except PipelineStopped:
+        pass
+    except Exception as e:
+        errors.append(f"read/parse stage failed: {e!r}")
+        print(errors[-1])
+        stop.set()
+    except BaseException:
+        stop.set()  # e.g. Ctrl-C: let the other stages wind down before exiting
+        raise
+    finally:
+        embedder.join()
+        writer.join()
+
+    ingest_elapsed = time.monotonic() - started
+    print(f"Ingested {len(written)} candidates in {ingest_elapsed:.1f}s "
+          f"({len(written) / ingest_elapsed if ingest_elapsed else 0:.1f}/s), "
+          f"{skipped} already present, {failed} failed to parse, {len(write_failed)} failed to insert")
+    if errors:
+        print(f"Pipeline stopped early: {'; '.join(errors)}")
+
+    if args.analyze and written and not args.dry_run:
+        asyncio.run(analyze_rows(sb, written, args.analyze_concurrency, stats["analyze"]))
+
+    wall = time.monotonic() - started
+    print("Per-stage throughput (parse busy time is summed across workers):")
+    for stage in stats.values():
+        if stage.items:
+            print(stage.report(wall))
+
+    if errors or failed or write_failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,58 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import resume, jobs, applications, ai_routes, auth, profiles, admin
 from app.core.config import settings
+from app.core.executor import shutdown_executor
+from app.core.uploads import UploadLimitMiddleware
+from app.services import embedder
+from app.services.application_feedback import run_feedback_sweeper
+
+
+_stop_index_sync = threading.Event()
+
+
+def _sync_job_index():
+    """Load the BM25 job index, then keep it in step with job edits made by any worker."""
+    while True:
+        try:
+            jobs.sync_job_index()
+        except Exception as e:
+            print(f"Could not sync the BM25 job index: {e}")
+        if _stop_index_sync.wait(settings.JOB_INDEX_SYNC_SECONDS):
+            return
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the embedding model in the background so the worker can serve /health immediately
+    if settings.EMBED_WARMUP:
+        threading.Thread(target=embedder.warm_up, name="embedder-warmup", daemon=True).start()
+    threading.Thread(target=_sync_job_index, name="bm25-sync", daemon=True).start()
+    # Finish application feedback that was still pending when the previous process stopped
+    sweeper = asyncio.create_task(run_feedback_sweeper())
+    yield
+    sweeper.cancel()
+    _stop_index_sync.set()
+    shutdown_executor()
+
 
 app = FastAPI(
     title="CareerPilot AI API",
     description="AI-powered job portal backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Added before CORS so CORS stays the outer layer and 413 responses still carry CORS headers
+app.add_middleware(
+    UploadLimitMiddleware,
+    # Allow some headroom for the multipart envelope around the file itself
+    max_body_bytes=settings.RESUME_MAX_UPLOAD_BYTES + 64 * 1024,
+    paths={"/api/resume/upload"},
 )
 
 app.add_middleware(
@@ -38,3 +84,12 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness probe: only reports ready once embedding-dependent routes can serve without a model load."""
+    status = embedder.model_status()
+    if not embedder.is_ready():
+        return JSONResponse(status_code=503, content={"status": "starting", "embedding_model": status})
+    return {"status": "ready", "embedding_model": status}
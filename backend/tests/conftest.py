@@ -0,0 +1,172 @@
+import operator
+import os
+import re
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+import pytest
+
+# Settings are validated at import time; the suite never talks to Supabase or Groq
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("LLM_PROVIDER", "fake")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_OPERATORS = {
+    "eq": operator.eq, "neq": operator.ne, "gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le,
+}
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(text):
+        depth += ch == "("
+        depth -= ch == ")"
+        if ch == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_logic(text: str) -> Callable[[dict], bool]:
+    """A PostgREST logic tree (the argument of or_, with nested and(...)/or(...)) as a row predicate."""
+    match = re.fullmatch(r"(and|or)\((.*)\)", text)
+    if match:
+        children = [_parse_logic(part) for part in _split_top_level(match.group(2))]
+        combine = all if match.group(1) == "and" else any
+        return lambda row: combine(child(row) for child in children)
+    column, op, value = text.split(".", 2)
+    value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+    return lambda row: row.get(column) is not None and _OPERATORS[op](row[column], value)
+
+
+class FakeQuery:
+    """The slice of the PostgREST query builder the app uses, evaluated over in-memory rows."""
+
+    def __init__(self, client: "FakeSupabase", table: str, op: str, payload: Any = None, on_conflict: str = "id"):
+        self.client, self.table, self.op, self.payload, self.on_conflict = client, table, op, payload, on_conflict
+        self.predicates: List[Callable[[dict], bool]] = []
+        self.orders: List[tuple] = []
+        self.window = slice(None)
+
+    def _filter(self, column, op, value):
+        self.predicates.append(lambda row: row.get(column) is not None and _OPERATORS[op](row[column], value))
+        return self
+
+    def eq(self, column, value): return self._filter(column, "eq", value)
+    def neq(self, column, value): return self._filter(column, "neq", value)
+    def gt(self, column, value): return self._filter(column, "gt", value)
+    def gte(self, column, value): return self._filter(column, "gte", value)
+    def lt(self, column, value): return self._filter(column, "lt", value)
+    def lte(self, column, value): return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        self.predicates.append(lambda row: row.get(column) in values)
+        return self
+
+    def or_(self, filters: str):
+        self.predicates.append(_parse_logic(f"or({filters})"))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.window = slice(self.window.start, (self.window.start or 0) + n)
+        return self
+
+    def range(self, start, end):
+        self.window = slice(start, end + 1)
+        return self
+
+    def execute(self):
+        return self.client._run(self)
+
+
+class FakeTable:
+    def __init__(self, client: "FakeSupabase", name: str):
+        self.client, self.name = client, name
+
+    def select(self, _columns="*", count=None):
+        return FakeQuery(self.client, self.name, "select")
+
+    def insert(self, payload):
+        return FakeQuery(self.client, self.name, "insert", payload)
+
+    def upsert(self, payload, on_conflict="id"):
+        return FakeQuery(self.client, self.name, "upsert", payload, on_conflict)
+
+    def update(self, payload):
+        return FakeQuery(self.client, self.name, "update", payload)
+
+    def delete(self):
+        return FakeQuery(self.client, self.name, "delete")
+
+
+class FakeSupabase:
+    """
+    In-memory stand-in for the Supabase client's PostgREST API: tables are lists of dicts in
+    `tables` and selects return every column. `before_write` hooks run ahead of each write
+    (e.g. to simulate a concurrent writer) and `max_rows` caps what a select returns.
+    Every executed query is recorded in `queries`.
+    """
+
+    def __init__(self, **tables: List[dict]):
+        self.tables: Dict[str, List[dict]] = {name: [dict(r) for r in rows] for name, rows in tables.items()}
+        self.before_write: Dict[str, Callable[["FakeQuery"], None]] = {}
+        self.queries: List[FakeQuery] = []
+        self.max_rows: int | None = None  # PostgREST's db-max-rows: longer results are silently cut off
+        self._ids = 0
+
+    def table(self, name: str) -> FakeTable:
+        return FakeTable(self, name)
+
+    def _new_row(self, payload: dict) -> dict:
+        self._ids += 1
+        return {"id": f"{self._ids:08d}", **payload}
+
+    def _run(self, query: FakeQuery):
+        self.queries.append(query)
+        if query.op != "select" and query.table in self.before_write:
+            self.before_write[query.table](query)
+        rows = self.tables.setdefault(query.table, [])
+        payloads = query.payload if isinstance(query.payload, list) else [query.payload]
+        if query.op == "insert":
+            inserted = [self._new_row(p) for p in payloads]
+            rows.extend(inserted)
+            return SimpleNamespace(data=[dict(r) for r in inserted], count=None)
+        if query.op == "upsert":
+            written = []
+            for payload in payloads:
+                key = payload.get(query.on_conflict)
+                existing = next((r for r in rows if key is not None and r.get(query.on_conflict) == key), None)
+                if existing is None:
+                    existing = self._new_row(payload)
+                    rows.append(existing)
+                existing.update(payload)
+                written.append(dict(existing))
+            return SimpleNamespace(data=written, count=None)
+
+        matched = [r for r in rows if all(p(r) for p in query.predicates)]
+        count = len(matched)
+        for column, desc in reversed(query.orders):
+            matched.sort(key=lambda r: r.get(column), reverse=desc)
+        matched = matched[query.window]
+        if query.op == "select" and self.max_rows is not None:
+            matched = matched[:self.max_rows]
+        if query.op == "update":
+            for row in matched:
+                row.update(query.payload)
+        elif query.op == "delete":
+            self.tables[query.table] = [r for r in rows if not any(r is m for m in matched)]
+        return SimpleNamespace(data=[dict(r) for r in matched], count=count)
+
+
+@pytest.fixture
+def supabase() -> FakeSupabase:
+    return FakeSupabase()
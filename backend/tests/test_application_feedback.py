@@ -0,0 +1,118 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from app.core import groq_client
+from app.core.config import settings
+from app.core.llm_governor import LLMGovernor
+from app.core.llm_providers import FakeProvider, FakeProviderError
+from app.services import application_feedback
+from app.services.application_feedback import FEEDBACK_MAX_ATTEMPTS, generate_application_feedback, sweep_pending_feedback
+
+
+class _CountingProvider(FakeProvider):
+    def __init__(self, fail_with=None):
+        super().__init__(ttft_ms=5, latency_sigma=0.0, tokens_per_second=1e6, seed=0)
+        self.fail_with, self.calls = fail_with, 0
+
+    async def complete(self, system_prompt, user_prompt, max_tokens):
+        self.calls += 1
+        if self.fail_with:
+            raise FakeProviderError(self.fail_with)
+        return await super().complete(system_prompt, user_prompt, max_tokens)
+
+
+def _ago(seconds: float) -> str:
+    return (application_feedback._now() - timedelta(seconds=seconds)).isoformat()
+
+
+def _pending(app_id: str, attempts: int = 0, updated_at: str = None) -> dict:
+    return {
+        "id": app_id, "user_id": "user-1", "job_id": "job-1", "ai_feedback": [],
+        "ai_feedback_status": "pending", "ai_feedback_attempts": attempts,
+        "ai_feedback_updated_at": updated_at or _ago(0),
+    }
+
+
+def _seed(supabase, *applications):
+    supabase.tables.update(
+        applications=[dict(a) for a in applications],
+        jobs=[{"id": "job-1", "requirements": "python, sql", "description": "Build data services"}],
+        resumes=[{"user_id": "user-1", "raw_text": "Python developer", "skills": ["python"], "experience_years": 3}],
+        token_usage_logs=[],
+    )
+    return supabase
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = _CountingProvider()
+    monkeypatch.setattr(groq_client, "_provider", provider)
+    monkeypatch.setattr(groq_client, "_governor", LLMGovernor(tokens_per_minute=1_000_000, max_in_flight=4, max_retries=0))
+    monkeypatch.setattr(groq_client, "_response_cache", groq_client.LRUCache(max_size=16))
+    return provider
+
+
+def test_feedback_is_generated_and_written_back(provider, supabase):
+    sb = _seed(supabase, _pending("app-1"))
+    asyncio.run(generate_application_feedback(sb, "app-1"))
+
+    row = sb.tables["applications"][0]
+    assert row["ai_feedback_status"] == "ready"
+    assert len(row["ai_feedback"]) == 3
+    assert row["ai_feedback_attempts"] == 1
+    assert len(sb.tables["token_usage_logs"]) == 1
+
+
+def test_concurrent_workers_generate_once(provider, supabase):
+    sb = _seed(supabase, _pending("app-1"))
+
+    async def both():
+        await asyncio.gather(generate_application_feedback(sb, "app-1"), generate_application_feedback(sb, "app-1"))
+
+    asyncio.run(both())
+    assert provider.calls == 1
+    assert len(sb.tables["token_usage_logs"]) == 1
+
+
+def test_row_claimed_within_the_lease_is_left_to_its_worker(provider, supabase):
+    sb = _seed(supabase, _pending("app-1", attempts=1, updated_at=_ago(1)))
+    asyncio.run(generate_application_feedback(sb, "app-1"))
+    assert provider.calls == 0
+    assert sb.tables["applications"][0]["ai_feedback_attempts"] == 1
+
+
+def test_sweep_resumes_only_expired_leases(provider, supabase):
+    expired = _ago(settings.APPLICATION_FEEDBACK_LEASE_SECONDS + 5)
+    sb = _seed(
+        supabase,
+        _pending("stale", attempts=1, updated_at=expired),
+        _pending("live", attempts=1, updated_at=_ago(1)),
+        _pending("exhausted", attempts=FEEDBACK_MAX_ATTEMPTS, updated_at=expired),
+    )
+    assert asyncio.run(sweep_pending_feedback(sb)) == 1
+
+    status = {r["id"]: r["ai_feedback_status"] for r in sb.tables["applications"]}
+    # The last attempt of "exhausted" died with its worker: it is failed, not left pending forever
+    assert status == {"stale": "ready", "live": "pending", "exhausted": "failed"}
+    assert provider.calls == 1
+
+
+def test_interrupted_last_attempt_keeps_its_lease(provider, supabase):
+    sb = _seed(supabase, _pending("app-1", attempts=FEEDBACK_MAX_ATTEMPTS, updated_at=_ago(1)))
+    assert asyncio.run(sweep_pending_feedback(sb)) == 0
+    assert sb.tables["applications"][0]["ai_feedback_status"] == "pending"
+
+
+def test_row_is_marked_failed_after_the_last_attempt(provider, supabase):
+    provider.fail_with = 500
+    expired = _ago(settings.APPLICATION_FEEDBACK_LEASE_SECONDS + 5)
+    sb = _seed(supabase, _pending("app-1"))
+    row = sb.tables["applications"][0]
+
+    for attempt in range(1, FEEDBACK_MAX_ATTEMPTS + 1):
+        asyncio.run(sweep_pending_feedback(sb) if attempt > 1 else generate_application_feedback(sb, "app-1"))
+        assert row["ai_feedback_attempts"] == attempt
+        row["ai_feedback_updated_at"] = expired  # the failed worker's lease runs out
+
+    assert row["ai_feedback_status"] == "failed"
+    assert provider.calls == FEEDBACK_MAX_ATTEMPTS
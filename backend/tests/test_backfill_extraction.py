@@ -0,0 +1,27 @@
+from backfill_extraction import extract_job, write_updates
+from app.services.skill_extractor import canonicalize_skills, get_taxonomy_version
+
+
+def _job(job_id: str, skills, version) -> dict:
+    return {"id": job_id, "company_id": "c1", "title": "Engineer", "skills_required": skills, "taxonomy_version": version}
+
+
+def test_only_jobs_with_something_to_record_are_written(supabase):
+    version = get_taxonomy_version()
+    canonical = canonicalize_skills(["python"])
+    rows = [
+        _job("current", canonical, version),
+        _job("stale-version", canonical, "old"),
+        _job("changed", ["Python", "python"], version),
+    ]
+    supabase.tables["jobs"] = [dict(r, updated_at="t0") for r in rows]
+
+    assert write_updates(supabase, "jobs", [extract_job(r) for r in rows]) == 1
+
+    written = [row["id"] for q in supabase.queries if q.op == "upsert" for row in q.payload]
+    assert sorted(written) == ["changed", "stale-version"]
+    jobs = {r["id"]: r for r in supabase.tables["jobs"]}
+    assert jobs["stale-version"]["taxonomy_version"] == version
+    assert jobs["stale-version"]["updated_at"] == "t0"
+    assert jobs["changed"]["skills_required"] == canonical
+    assert jobs["changed"]["updated_at"] != "t0"
@@ -0,0 +1,23 @@
+from app.services.bm25_index import job_index
+from app.services.scorer import index_job, score_jobs
+
+
+def test_scoring_does_not_touch_the_index():
+    job = {"id": "bm25-unindexed", "description": "python django postgres", "status": "active", "updated_at": "v1"}
+    before = job_index.stats()
+    score_jobs({"raw_text": "python"}, [job])
+    assert "bm25-unindexed" not in job_index
+    assert job_index.stats() == before
+
+
+def test_index_job_follows_edits_and_closing():
+    job = {"id": "bm25-edited", "description": "python django", "status": "active", "updated_at": "v1"}
+    assert index_job(job)
+    assert job_index.is_current("bm25-edited", "v1")
+
+    assert index_job(dict(job, description="go kubernetes", updated_at="v2"))
+    assert job_index.is_current("bm25-edited", "v2")
+    assert job_index.query(["django"], ["bm25-edited"]) == {}
+
+    assert not index_job(dict(job, status="closed", updated_at="v3"))
+    assert "bm25-edited" not in job_index
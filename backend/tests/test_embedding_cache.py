@@ -0,0 +1,24 @@
+from app.services.embedding_cache import EmbeddingCache, cache_key
+
+
+def test_disk_tier_is_opened_on_first_use(tmp_path):
+    db_path = tmp_path / "cache" / "embeddings.sqlite3"
+    cache = EmbeddingCache(4, str(db_path))
+    assert not db_path.parent.exists()
+
+    key = cache_key("model", "python developer")
+    assert cache.get(key) is None
+    assert db_path.exists()
+    cache.set(key, [0.5, 0.25])
+
+    # A fresh process (empty memory tier) is answered from disk
+    restarted = EmbeddingCache(4, str(db_path))
+    assert restarted.get(key) == [0.5, 0.25]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_without_a_path_only_memory_is_used():
+    cache = EmbeddingCache(4)
+    cache.set("k", [1.0])
+    assert cache.get("k") == [1.0]
+    assert cache.stats()["disk_writes"] == 0
@@ -0,0 +1,85 @@
+import random
+from types import SimpleNamespace
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api import jobs as jobs_api
+from app.services.feed_ranker import decode_cursor, ranking_context, _relevance, top_k_jobs
+
+RESUME = {"skills": ["python", "sql", "go"], "industry": "technology"}
+SKILLS = ["python", "sql", "go", "java", "figma"]
+
+
+def _jobs(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    # Few distinct skill sets and industries, so many jobs tie on relevance
+    return [
+        {
+            "id": f"job-{rng.randrange(10 ** 6):06d}-{i}",
+            "title": "Engineer",
+            "skills_required": rng.sample(SKILLS, rng.randint(0, 2)),
+            "industry": rng.choice(["technology", "finance"]),
+            "created_at": f"2026-10-{1 + i % 28:02d}T00:00:00+00:00",
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("k", [1, 7, 50])
+def test_pages_are_stable_and_never_overlap(k):
+    jobs = _jobs(300)
+    scores = [random.Random(i).choice([40, 55, 70, 85]) for i in range(len(jobs))]
+    context = ranking_context(RESUME)
+    expected = sorted(range(len(jobs)), key=lambda i: (-_relevance(jobs[i], context, scores[i]), jobs[i]["id"]))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = top_k_jobs(jobs, RESUME, k, match_scores=scores, cursor=cursor)
+        assert len(page) <= k
+        seen.extend(job["id"] for job in page)
+        if cursor is None:
+            break
+    assert seen == [jobs[i]["id"] for i in expected]
+    assert len(set(seen)) == len(jobs)
+    # The caller's rows are never written to
+    assert all("relevance_score" not in job and "match_score" not in job for job in jobs)
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.fixture
+def client(supabase, monkeypatch):
+    supabase.tables["jobs"] = _jobs(45, seed=1)
+    supabase.tables["resumes"] = [{"id": "resume-1", "user_id": "user-1", "raw_text": "python sql", **RESUME}]
+    supabase.auth = SimpleNamespace(get_user=lambda token: SimpleNamespace(user=SimpleNamespace(id="user-1")))
+    monkeypatch.setattr(jobs_api, "get_supabase", lambda token=None: supabase)
+    app = FastAPI()
+    app.include_router(jobs_api.router, prefix="/api/jobs")
+    return TestClient(app)
+
+
+def test_list_jobs_pages_ranked_results_with_the_cursor(client, supabase):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/jobs", params=params, headers={"Authorization": "Bearer t"}).json()
+        relevances = [job["relevance_score"] for job in body["jobs"]]
+        assert relevances == sorted(relevances, reverse=True)
+        seen.extend(job["id"] for job in body["jobs"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(job["id"] for job in supabase.tables["jobs"])
+
+
+def test_list_jobs_without_a_user_pages_by_offset(client):
+    body = client.get("/api/jobs", params={"limit": 10, "offset": 40}).json()
+    assert len(body["jobs"]) == 5
+    assert body["next_cursor"] is None
+
+
+def test_list_jobs_rejects_a_bad_cursor(client):
+    assert client.get("/api/jobs", params={"cursor": "%%%"}).status_code == 400
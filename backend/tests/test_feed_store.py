@@ -0,0 +1,82 @@
+from app.services import feed_store
+from app.services.feed_ranker import top_k_jobs
+from app.services.feed_store import FEED_BUCKET_SIZE, _insert_into_feed, _patch_feed
+
+RESUME = {"skills": ["python", "sql"], "industry": "technology"}
+
+
+def _job(i: int, skills, industry="finance") -> dict:
+    return {"id": f"job-{i:02d}", "skills_required": skills, "industry": industry}
+
+
+def _compatibility_feed(jobs, match_scores) -> dict:
+    ranked, _ = top_k_jobs(jobs, RESUME, len(jobs), match_scores=match_scores)
+    feed = {"highly_relevant": [], "based_on_skills": [], "trending": [], "ranking": "compatibility"}
+    for job in ranked:
+        bucket = feed[feed_store._bucket_name(job["match_score"])]
+        if len(bucket) < FEED_BUCKET_SIZE:
+            bucket.append(job)
+    return feed
+
+
+def test_insert_matches_full_recompute_for_compatibility_feeds():
+    skill_sets = [[], ["python"], ["python", "sql"], ["go"]]
+    jobs = [_job(i, skill_sets[i % 4], "technology" if i % 3 == 0 else "finance") for i in range(12)]
+    scores = [70 + (i * 7) % 30 for i in range(12)]
+    feed = _compatibility_feed(jobs, scores)
+
+    for i, (skills, score) in enumerate([(["python", "sql"], 72), ([], 99), (["go"], 71)], start=20):
+        new_job = _job(i, skills, "technology")
+        entry = top_k_jobs([new_job], RESUME, 1, match_scores=[score])[0][0]
+        _insert_into_feed(feed, entry)
+        jobs.append(new_job)
+        scores.append(score)
+        # Ordered by relevance, not by match score, exactly as a recompute would be
+        assert feed == _compatibility_feed(jobs, scores)
+        assert all("relevance_score" in j for j in feed["highly_relevant"])
+
+
+def test_insert_keeps_similarity_order():
+    feed = {"highly_relevant": [{"id": "a", "match_score": 90}, {"id": "b", "match_score": 75}], "ranking": "similarity"}
+    assert _insert_into_feed(feed, {"id": "c", "match_score": 80})
+    assert [j["id"] for j in feed["highly_relevant"]] == ["a", "c", "b"]
+
+
+def test_patch_does_not_overwrite_a_concurrent_refresh(supabase):
+    stale = {"user_id": "u", "resume_id": "r", "updated_at": "t0", "feed": {"trending": [], "ranking": "similarity"}}
+    refreshed = {**stale, "updated_at": "t1", "feed": {"trending": [{"id": "fresh", "match_score": 30}], "ranking": "similarity"}}
+    supabase.tables["user_feeds"] = [dict(stale)]
+
+    def refresh_lands_first(query):
+        # A refresh_user_feed finishes between the patch's read and its first write
+        supabase.before_write.pop("user_feeds")
+        supabase.tables["user_feeds"] = [dict(refreshed)]
+
+    supabase.before_write["user_feeds"] = refresh_lands_first
+    assert _patch_feed(supabase, dict(stale), {"id": "new"}, RESUME, similarity_score=20)
+
+    writes = [q for q in supabase.queries if q.op == "update"]
+    assert len(writes) == 2
+    # The refresh's feed survived and the new job was added to it
+    assert [j["id"] for j in supabase.tables["user_feeds"][0]["feed"]["trending"]] == ["fresh", "new"]
+
+
+def test_jobs_paused_or_closed_after_storing_are_not_served(supabase):
+    supabase.tables["jobs"] = [
+        {"id": "open", "status": "active"}, {"id": "paused", "status": "paused"}, {"id": "closed", "status": "closed"},
+    ]
+    feed = {
+        "highly_relevant": [{"id": "open", "match_score": 90}, {"id": "closed", "match_score": 80}],
+        "based_on_skills": [{"id": "paused", "match_score": 50}],
+        "trending": [],
+        "ranking": "compatibility",
+    }
+    served = feed_store.drop_inactive_jobs(supabase, feed)
+    assert served == {**feed, "highly_relevant": [{"id": "open", "match_score": 90}], "based_on_skills": []}
+
+
+def test_staleness_counts_every_feed(supabase):
+    now = feed_store._now()
+    supabase.tables["user_feeds"] = [{"user_id": f"user-{i:04d}", "computed_at": now} for i in range(2500)]
+    supabase.max_rows = 1000
+    assert feed_store.feed_staleness(supabase, page_size=1000)["feeds"] == 2500
@@ -0,0 +1,30 @@
+from app.api import jobs
+from app.services.bm25_index import job_index
+
+BATCH_STAMP = "2026-10-18T05:00:00.123456+00:00"  # one UPDATE statement: every row gets the same NOW()
+
+
+def _job(i: int, updated_at: str, status: str = "active") -> dict:
+    return {"id": f"00000000-0000-0000-0000-{i:012d}", "title": "Engineer", "description": f"python sync{i}",
+            "status": status, "updated_at": updated_at}
+
+
+def test_sync_pages_past_rows_sharing_one_timestamp(supabase, monkeypatch):
+    supabase.tables["jobs"] = [_job(i, BATCH_STAMP) for i in range(1, 1201)]
+    monkeypatch.setattr(jobs, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(jobs, "_index_cursor", ("2026-10-18T04:00:00+00:00", "00000000-0000-0000-0000-000000000000"))
+
+    assert jobs.sync_job_index(page_size=500) == 1200
+    assert all(job["id"] in job_index for job in supabase.tables["jobs"])
+    assert jobs._index_cursor == (BATCH_STAMP, supabase.tables["jobs"][-1]["id"])
+
+    # Nothing changed since: the next sync reads nothing
+    assert jobs.sync_job_index(page_size=500) == 0
+
+    # A later edit (here: closing a job) is picked up and drops it from the index
+    supabase.tables["jobs"][0].update(status="closed", updated_at="2026-10-18T05:01:00+00:00")
+    assert jobs.sync_job_index(page_size=500) == 1
+    assert supabase.tables["jobs"][0]["id"] not in job_index
+
+    for job in supabase.tables["jobs"]:
+        job_index.remove(job["id"])
@@ -0,0 +1,95 @@
+import asyncio
+import httpx
+import pytest
+from groq import APIConnectionError, APITimeoutError
+from app.core import groq_client
+from app.core.llm_governor import LLMGovernor
+from app.core.llm_providers import FakeProvider, FakeProviderError
+
+CAPACITY = 10_000
+
+
+class _FailingProvider(FakeProvider):
+    """Opens no stream and completes nothing: every call fails with `status_code`."""
+
+    def __init__(self, status_code: int):
+        super().__init__(ttft_ms=0, seed=0)
+        self.status_code = status_code
+
+    async def complete(self, system_prompt, user_prompt, max_tokens):
+        raise FakeProviderError(self.status_code)
+
+    async def open_stream(self, system_prompt, user_prompt, max_tokens, usage):
+        raise FakeProviderError(self.status_code)
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    governor = LLMGovernor(tokens_per_minute=CAPACITY, max_in_flight=2, max_retries=2, backoff_base_seconds=0.001)
+    monkeypatch.setattr(groq_client, "_governor", governor)
+    monkeypatch.setattr(groq_client, "_response_cache", groq_client.LRUCache(max_size=16))
+    return governor
+
+
+async def _stream(prompt: str):
+    return [delta async for delta in groq_client.chat_completion_stream("system", prompt, max_tokens=2000)]
+
+
+@pytest.mark.parametrize("status", [500, 503])
+def test_failed_completion_refunds_its_reservation(governor, monkeypatch, status):
+    monkeypatch.setattr(groq_client, "_provider", _FailingProvider(status))
+    with pytest.raises(FakeProviderError):
+        asyncio.run(groq_client.chat_completion("system", "prompt", max_tokens=2000))
+    assert governor.stats()["tokens_available"] == CAPACITY
+    assert governor.active == 0
+
+
+@pytest.mark.parametrize("status", [500, 503])
+def test_stream_that_never_opens_refunds_its_reservation(governor, monkeypatch, status):
+    monkeypatch.setattr(groq_client, "_provider", _FailingProvider(status))
+    with pytest.raises(FakeProviderError):
+        asyncio.run(_stream("prompt"))
+    assert governor.stats()["tokens_available"] == CAPACITY
+
+
+def test_successful_calls_are_charged_their_usage(governor, monkeypatch):
+    monkeypatch.setattr(groq_client, "_provider", FakeProvider(ttft_ms=0, tokens_per_second=1e6, completion_tokens=50, seed=1))
+    _, usage = asyncio.run(groq_client.chat_completion("system", "prompt", max_tokens=2000))
+    assert governor.stats()["tokens_available"] == CAPACITY - usage["total_tokens"]
+
+
+class _FlakyProvider(FakeProvider):
+    """Fails its first call with `error`, then answers normally."""
+
+    def __init__(self, error: Exception):
+        super().__init__(ttft_ms=0, tokens_per_second=1e6, seed=0)
+        self.error, self.calls = error, 0
+
+    async def complete(self, system_prompt, user_prompt, max_tokens):
+        self.calls += 1
+        if self.calls == 1:
+            raise self.error
+        return await super().complete(system_prompt, user_prompt, max_tokens)
+
+
+@pytest.mark.parametrize("error", [
+    FakeProviderError(500),
+    FakeProviderError(502),
+    FakeProviderError(504),
+    APIConnectionError(request=httpx.Request("POST", "https://api.groq.com")),
+    APITimeoutError(request=httpx.Request("POST", "https://api.groq.com")),
+])
+def test_server_and_connection_errors_are_retried(governor, monkeypatch, error):
+    provider = _FlakyProvider(error)
+    monkeypatch.setattr(groq_client, "_provider", provider)
+    content, _ = asyncio.run(groq_client.chat_completion("system", "prompt", max_tokens=2000))
+    assert content and provider.calls == 2
+    assert governor.stats()["retries"] == 1
+
+
+def test_client_errors_are_not_retried(governor, monkeypatch):
+    provider = _FlakyProvider(FakeProviderError(400))
+    monkeypatch.setattr(groq_client, "_provider", provider)
+    with pytest.raises(FakeProviderError):
+        asyncio.run(groq_client.chat_completion("system", "prompt", max_tokens=2000))
+    assert provider.calls == 1
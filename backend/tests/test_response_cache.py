@@ -0,0 +1,90 @@
+import asyncio
+import json
+import pytest
+from types import SimpleNamespace
+from app.api import jobs
+from app.core import groq_client
+from app.core.llm_governor import LLMGovernor
+from app.core.llm_providers import FakeProvider
+from app.services.prompt_builder import PromptBuilder
+
+USAGE = {"prompt_tokens": 30, "completion_tokens": 20, "total_tokens": 50}
+
+
+class _ScriptedProvider(FakeProvider):
+    """Answers every call with `content`, counting the calls that reached it."""
+
+    def __init__(self, content: str):
+        super().__init__(ttft_ms=0, seed=0)
+        self.content, self.calls = content, 0
+
+    async def complete(self, system_prompt, user_prompt, max_tokens):
+        self.calls += 1
+        return self.content, dict(USAGE)
+
+    async def open_stream(self, system_prompt, user_prompt, max_tokens, usage):
+        self.calls += 1
+
+        async def deltas():
+            yield self.content
+            usage.update(USAGE)
+
+        return deltas()
+
+
+@pytest.fixture(autouse=True)
+def governor(monkeypatch):
+    monkeypatch.setattr(groq_client, "_governor", LLMGovernor(tokens_per_minute=1_000_000, max_in_flight=4, max_retries=0))
+    monkeypatch.setattr(groq_client, "_response_cache", groq_client.LRUCache(max_size=16))
+
+
+def _use(monkeypatch, content: str) -> _ScriptedProvider:
+    provider = _ScriptedProvider(content)
+    monkeypatch.setattr(groq_client, "_provider", provider)
+    return provider
+
+
+def _complete(validate):
+    return asyncio.run(groq_client.chat_completion("system", "prompt", max_tokens=100, cache_key="k", validate=validate))
+
+
+async def _collect(validate):
+    stream = groq_client.chat_completion_stream("system", "prompt", max_tokens=100, cache_key="k", validate=validate)
+    return "".join([delta async for delta in stream])
+
+
+def test_validated_response_is_served_from_cache(monkeypatch):
+    provider = _use(monkeypatch, '{"explanation": "ok", "tips": []}')
+    assert _complete(jobs._parse_explanation)[1] == USAGE
+    content, usage = _complete(jobs._parse_explanation)
+    assert json.loads(content)["explanation"] == "ok"
+    assert usage["total_tokens"] == 0
+    assert provider.calls == 1
+
+
+@pytest.mark.parametrize("validate", [jobs._parse_explanation, None])
+def test_unvalidated_response_is_not_cached(monkeypatch, validate):
+    provider = _use(monkeypatch, "Sorry, I can't produce JSON right now.")
+    _complete(validate)
+    _complete(validate)
+    assert provider.calls == 2
+
+
+def test_malformed_stream_is_not_cached(monkeypatch):
+    provider = _use(monkeypatch, '{"explanation": "cut off')
+    asyncio.run(_collect(jobs._parse_explanation))
+    asyncio.run(_collect(jobs._parse_explanation))
+    assert provider.calls == 2
+
+    provider.content = '{"explanation": "ok", "tips": []}'
+    asyncio.run(_collect(jobs._parse_explanation))
+    assert asyncio.run(_collect(jobs._parse_explanation)) == provider.content
+    assert provider.calls == 3
+
+
+def test_cache_hits_log_no_token_usage(supabase):
+    user, prompt = SimpleNamespace(id="user-1"), PromptBuilder("job_score", "system").add("prompt").build()
+    content = '{"explanation": "ok", "tips": []}'
+    jobs._score_explanation(supabase, user, content, dict(USAGE), "/api/jobs/j/score", prompt)
+    jobs._score_explanation(supabase, user, content, groq_client._no_usage(), "/api/jobs/j/score", prompt)
+    assert [row["total_tokens"] for row in supabase.tables.get("token_usage_logs", [])] == [50]
@@ -0,0 +1,61 @@
+import random
+import re
+import pytest
+from app.services.resume_parser import analyze_resume_text, estimate_experience_years
+
+
+def _baseline_experience_years(text: str) -> float:
+    """The original forward-regex implementation the reversed patterns replaced."""
+    patterns = [
+        r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
+        r'experience\s*(?:of\s*)?(\d+)\+?\s*years?',
+        r'(\d+)\+?\s*yr[s]?\s*(?:of\s*)?(?:experience|exp)',
+    ]
+    for pattern in patterns:
+        matches = re.findall(pattern, text.lower())
+        if matches:
+            return float(max(int(m) for m in matches))
+
+    matches = re.findall(r'(20\d{2})\s*[-–]\s*(20\d{2}|present|current)', text.lower())
+    if matches:
+        total = 0
+        for start, end in matches:
+            end_yr = 2026 if end in ['present', 'current'] else int(end)
+            total += max(0, end_yr - int(start))
+        return float(min(total, 30))
+    return 0.0
+
+
+# Pieces of the patterns, recombined so the fragments hit partial and overlapping matches
+PIECES = [
+    "1", "3", "10", "25", "2019", "2021", "+", " ", "  ", "\n", "\t", "year", "years", "yr", "yrs",
+    "of", " of ", "experience", "exp", "Experience", "YEARS", "-", "–", "present", "current",
+    "ecneirepxe", "s", "x", "5+", "12+ years", "experience of 4 years", "٣",
+]
+
+
+def _fragment(rng: random.Random) -> str:
+    return "".join(rng.choice(PIECES) for _ in range(rng.randint(1, 25)))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_experience_matches_forward_patterns(seed):
+    rng = random.Random(seed)
+    for _ in range(5000):
+        text = _fragment(rng)
+        assert estimate_experience_years(text) == _baseline_experience_years(text), repr(text)
+
+
+def test_experience_examples():
+    assert estimate_experience_years("Over 7+ years of experience in Python, 3 years experience in Go") == 7.0
+    assert estimate_experience_years("Professional experience of 4 years") == 4.0
+    assert estimate_experience_years("10 yrs exp") == 10.0
+    assert estimate_experience_years("Acme 2019 - 2022\nInitech 2022 – present") == 7.0
+    assert estimate_experience_years("no numbers here") == 0.0
+
+
+def test_analyze_resume_text_uses_the_same_detectors():
+    text = "Senior Software Engineer with 6 years of experience. M.Sc in Computer Science. AWS, cloud, devops."
+    features = analyze_resume_text(text)
+    assert features == (6.0, "masters", "technology", "senior")
+    assert features.experience_years == _baseline_experience_years(text)
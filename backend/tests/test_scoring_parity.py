@@ -0,0 +1,92 @@
+import random
+import pytest
+from app.services.scorer import compute_compatibility_score, score_jobs
+from app.services.scoring_profiles import get_job_profile, get_resume_profile
+
+SKILLS = ["python", "react", "go", "sql", "docker", "kubernetes", "aws", "java", "figma", "excel"]
+WORDS = SKILLS + ["build", "scalable", "services", "team", "data", "design", "customers", "platform", "ci-cd", "node.js"]
+EDUCATION = ["other", "associate", "bachelors", "masters", "phd", None]
+INDUSTRIES = ["technology", "design", "marketing", "finance", "sales", "healthcare", None]
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40)))
+
+
+def _embedding(rng: random.Random):
+    if rng.random() < 0.2:
+        return None
+    return [rng.uniform(-1, 1) for _ in range(16)]
+
+
+def _resume(rng: random.Random) -> dict:
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(0, 6)),
+        "experience_years": rng.choice([0, 0.5, 1, 2, 3, 5, 8, 12, 20]),
+        "education_level": rng.choice(EDUCATION),
+        "industry": rng.choice(INDUSTRIES),
+        "raw_text": _text(rng),
+        "embedding": _embedding(rng),
+    }
+
+
+def _job(rng: random.Random) -> dict:
+    skills = rng.sample(SKILLS, rng.randint(0, 5))
+    job = {
+        "title": f"Senior {skills[0].title()} Engineer" if skills and rng.random() < 0.5 else "Engineer",
+        "skills_required": skills,
+        "experience_min": rng.choice([0, 1, 2, 3, 5, 8]),
+        "education_level": rng.choice(EDUCATION),
+        "industry": rng.choice(INDUSTRIES),
+        "description": _text(rng),
+        "embedding": _embedding(rng),
+    }
+    # Entry-level roles store a maximum of 0; older rows have none at all
+    max_choice = rng.random()
+    if max_choice < 0.25:
+        job["experience_max"] = 0
+    elif max_choice < 0.85:
+        job["experience_max"] = job["experience_min"] + rng.choice([0, 1, 2, 4, 6])
+    return job
+
+
+def _per_job(resume: dict, job: dict) -> dict:
+    return compute_compatibility_score(
+        user_skills=resume["skills"],
+        user_experience_years=resume["experience_years"],
+        user_education=resume["education_level"],
+        user_industry=resume["industry"],
+        resume_embedding=resume["embedding"] or [],
+        job_skills=job["skills_required"],
+        job_experience_min=job.get("experience_min", 0),
+        job_experience_max=job.get("experience_max", 10),
+        job_education=job["education_level"],
+        job_industry=job["industry"],
+        job_description=job["description"],
+        resume_text=resume["raw_text"],
+        job_embedding=job["embedding"],
+        job_title=job["title"],
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_score_jobs_matches_per_job_scoring(seed):
+    rng = random.Random(seed)
+    jobs = [_job(rng) for _ in range(300)]
+    for _ in range(10):
+        resume = _resume(rng)
+        assert score_jobs(resume, jobs) == [_per_job(resume, job) for job in jobs]
+
+
+def test_precompiled_profiles_score_like_rows():
+    rng = random.Random(42)
+    jobs = [_job(rng) for _ in range(200)]
+    resume = _resume(rng)
+    assert score_jobs(get_resume_profile(resume), [get_job_profile(job) for job in jobs]) == score_jobs(resume, jobs)
+
+
+def test_zero_experience_max_is_kept():
+    resume = {"skills": ["python"], "experience_years": 0, "raw_text": "python"}
+    job = {"skills_required": ["python"], "experience_min": 0, "experience_max": 0, "description": "python"}
+    assert score_jobs(resume, [job])[0]["experience_match"] == 100
+    assert score_jobs(dict(resume, experience_years=3), [job])[0]["experience_match"] == 85
@@ -0,0 +1,70 @@
+import random
+import re
+import pytest
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.skill_extractor import extract_skills, find_skill_matches, get_taxonomy, load_taxonomy
+
+SEPARATORS = [" ", " ", ", ", ". ", "/", "-", "(", ")", "+", "#", ".", "\n", "", "_", "'s "]
+FILLER = ["experience", "with", "and", "senior", "team", "re", "act", "java", "script", "node", "s", "js", "2024"]
+
+
+def _baseline_extract(text: str) -> list:
+    """The original extractor: one \\bterm\\b search per skill and per alias."""
+    taxonomy = get_taxonomy()
+    text_lower = text.lower()
+    found = {s for s in taxonomy.skills if re.search(r"\b" + re.escape(s) + r"\b", text_lower)}
+    found |= {c for a, c in taxonomy.aliases.items() if re.search(r"\b" + re.escape(a) + r"\b", text_lower)}
+    return sorted(found)
+
+
+def _random_text(rng: random.Random, vocabulary: list) -> str:
+    parts = []
+    for _ in range(rng.randint(1, 30)):
+        word = rng.choice(vocabulary) if rng.random() < 0.6 else rng.choice(FILLER)
+        if rng.random() < 0.3:
+            word = word.upper() if rng.random() < 0.5 else word.title()
+        parts.append(word + rng.choice(SEPARATORS))
+    return "".join(parts)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_extract_skills_matches_baseline(seed):
+    taxonomy = get_taxonomy()
+    vocabulary = sorted(taxonomy.skills | taxonomy.aliases.keys())
+    rng = random.Random(seed)
+    for _ in range(1000):
+        text = _random_text(rng, vocabulary)
+        assert extract_skills(text) == _baseline_extract(text), text
+
+
+def test_match_offsets_point_at_the_term():
+    taxonomy = get_taxonomy()
+    text = "Built React Native apps with ReactJS, Node.js and C++ (k8s, CI/CD)."
+    matches = find_skill_matches(text)
+    for m in matches:
+        term = text[m.start:m.end].lower()
+        assert taxonomy.aliases.get(term, term) == m.skill
+    assert {m.skill for m in matches} == set(_baseline_extract(text))
+
+
+@pytest.mark.parametrize("word_boundary", [True, False])
+def test_matcher_matches_per_keyword_search(word_boundary):
+    terms = ["go", "golang", "c", "c++", "c#", "node", "node.js", "react", "react native", "ci/cd", "ci"]
+    matcher = KeywordMatcher(terms, word_boundary=word_boundary)
+    rng = random.Random(7)
+    for _ in range(2000):
+        text = _random_text(rng, terms)
+        if word_boundary:
+            expected = {t for t in terms if re.search(r"\b" + re.escape(t) + r"\b", text.lower())}
+        else:
+            expected = {t for t in terms if t in text.lower()}
+        assert matcher.find_all(text) == expected, text
+
+
+def test_load_taxonomy_compiles_skills_and_aliases(tmp_path):
+    path = tmp_path / "taxonomy.json"
+    path.write_text('{"version": "test.1", "skills": ["Rust", "WebAssembly"], "aliases": {"wasm": "webassembly"}}')
+    taxonomy = load_taxonomy(str(path))
+    assert taxonomy.version == "test.1"
+    found = {taxonomy.aliases.get(t, t) for t in taxonomy.matcher.find_all("Rust compiled to WASM")}
+    assert found == {"rust", "webassembly"}
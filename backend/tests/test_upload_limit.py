@@ -0,0 +1,63 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.core.uploads import UploadLimitMiddleware
+
+LIMIT = 1024
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(UploadLimitMiddleware, max_body_bytes=LIMIT, paths={"/upload"})
+    return TestClient(app)
+
+
+def _multipart(size: int) -> tuple:
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"r.txt\"\r\n"
+        f"Content-Type: text/plain\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def _chunked(body: bytes, chunk_size: int = 256):
+    for i in range(0, len(body), chunk_size):
+        yield body[i:i + chunk_size]
+
+
+def test_small_upload_passes():
+    body, headers = _multipart(100)
+    response = _client().post("/upload", content=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_small_chunked_upload_passes():
+    body, headers = _multipart(100)
+    response = _client().post("/upload", content=_chunked(body), headers=headers)
+    assert response.status_code == 200
+
+
+def test_oversized_content_length_is_rejected():
+    body, headers = _multipart(5 * LIMIT)
+    response = _client().post("/upload", content=body, headers=headers)
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_upload_is_rejected():
+    body, headers = _multipart(5 * LIMIT)
+    response = _client().post("/upload", content=_chunked(body), headers=headers)
+    assert "content-length" not in {k.lower() for k in response.request.headers}
+    assert response.status_code == 413
+    assert response.json() == {"detail": "File too large"}
+
+
+def test_other_paths_are_not_limited():
+    body, headers = _multipart(5 * LIMIT)
+    client = _client()
+    assert client.post("/other", content=_chunked(body), headers=headers).status_code == 404
@@ -0,0 +1,11 @@
+-- database/07_add_taxonomy_version.sql
+-- Record which skills taxonomy version produced the stored skills, so stale extractions can be found
+
+ALTER TABLE resumes
+ADD COLUMN IF NOT EXISTS taxonomy_version TEXT;
+
+ALTER TABLE jobs
+ADD COLUMN IF NOT EXISTS taxonomy_version TEXT;
+
+CREATE INDEX IF NOT EXISTS resumes_taxonomy_version_idx ON public.resumes(taxonomy_version);
+CREATE INDEX IF NOT EXISTS jobs_taxonomy_version_idx ON public.jobs(taxonomy_version);
@@ -0,0 +1,11 @@
+-- database/08_add_resume_content_hash.sql
+-- Fingerprint uploads so re-uploading the same file (or the same text) reuses the previous parse, embedding and analysis
+
+ALTER TABLE resumes
+ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+ALTER TABLE resumes
+ADD COLUMN IF NOT EXISTS text_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS resumes_user_content_hash_idx ON public.resumes(user_id, content_hash);
+CREATE INDEX IF NOT EXISTS resumes_user_text_hash_idx ON public.resumes(user_id, text_hash);
@@ -0,0 +1,29 @@
+-- database/09_user_feeds.sql
+-- Materialized personalized feed: one row per user, recomputed in the background when the
+-- user's resume changes and patched when a new job is posted
+
+CREATE TABLE IF NOT EXISTS public.user_feeds (
+    user_id UUID PRIMARY KEY REFERENCES public.profiles(id) ON DELETE CASCADE,
+    resume_id UUID REFERENCES public.resumes(id) ON DELETE SET NULL,
+    feed JSONB NOT NULL DEFAULT '{}'::jsonb,
+    -- Lowest match score in the candidate pool when the pool was full; new jobs below it don't enter the feed
+    cutoff_score REAL,
+    computed_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS user_feeds_computed_at_idx ON public.user_feeds(computed_at);
+
+ALTER TABLE public.user_feeds ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their own feed"
+    ON public.user_feeds FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert their own feed"
+    ON public.user_feeds FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update their own feed"
+    ON public.user_feeds FOR UPDATE
+    USING (auth.uid() = user_id);
@@ -0,0 +1,19 @@
+-- database/10_application_feedback_status.sql
+-- AI feedback is generated after the application is stored. The status tracks the work so
+-- feedback interrupted by a restart is picked up again by the sweeper.
+
+ALTER TABLE applications
+ADD COLUMN IF NOT EXISTS ai_feedback_status TEXT DEFAULT 'ready'
+    CHECK (ai_feedback_status IN ('pending', 'ready', 'failed'));
+
+-- Generation attempts so far; a worker claims a row by bumping this from the value it read
+ALTER TABLE applications
+ADD COLUMN IF NOT EXISTS ai_feedback_attempts INT DEFAULT 0;
+
+-- When the row was inserted or last claimed; pending rows idle past the lease are retried
+ALTER TABLE applications
+ADD COLUMN IF NOT EXISTS ai_feedback_updated_at TIMESTAMPTZ DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS applications_ai_feedback_pending_idx
+    ON public.applications(ai_feedback_updated_at)
+    WHERE ai_feedback_status = 'pending';
@@ -0,0 +1,9 @@
+-- database/11_resume_digest.sql
+-- Compact resume summary (skills, roles, experience, highlights) computed at upload and used
+-- in LLM prompts instead of the raw text, plus the prompt tokens that saves per call
+
+ALTER TABLE public.resumes
+ADD COLUMN IF NOT EXISTS digest JSONB;
+
+ALTER TABLE public.token_usage_logs
+ADD COLUMN IF NOT EXISTS prompt_tokens_saved INTEGER DEFAULT 0;
@@ -0,0 +1,18 @@
+-- database/12_jobs_updated_at.sql
+-- Bump jobs.updated_at on every update, so edits made outside the API (dashboard, SQL) also
+-- change the job's version and are picked up by each worker's BM25 index sync
+
+CREATE OR REPLACE FUNCTION public.set_jobs_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS jobs_set_updated_at ON public.jobs;
+CREATE TRIGGER jobs_set_updated_at
+BEFORE UPDATE ON public.jobs
+FOR EACH ROW EXECUTE FUNCTION public.set_jobs_updated_at();
+
+CREATE INDEX IF NOT EXISTS jobs_updated_at_idx ON public.jobs(updated_at);
@@ -0,0 +1,52 @@
+-- database/13_partner_candidates.sql
+-- CVs bulk-ingested from partners (bulk_ingest.py). They are candidates, not users: they get
+-- their own tables instead of resumes/resume_analysis rows under somebody's profile, so no
+-- user's feed, analysis, roadmap or applications ever read them.
+
+CREATE TABLE IF NOT EXISTS public.candidate_sources (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name TEXT NOT NULL UNIQUE,          -- e.g. the partner or the dump the CVs came from
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS public.candidates (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    source_id UUID NOT NULL REFERENCES public.candidate_sources(id) ON DELETE CASCADE,
+    file_name TEXT,
+    raw_text TEXT,
+    skills TEXT[] DEFAULT '{}',
+    experience_years FLOAT DEFAULT 0,
+    education_level TEXT DEFAULT 'other',
+    industry TEXT DEFAULT 'technology',
+    seniority TEXT DEFAULT 'junior',
+    embedding vector(384),
+    taxonomy_version TEXT,
+    content_hash TEXT NOT NULL,
+    text_hash TEXT,
+    digest JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL,
+    -- A re-run of the same dump skips files it already ingested
+    UNIQUE (source_id, content_hash)
+);
+
+CREATE TABLE IF NOT EXISTS public.candidate_analysis (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    candidate_id UUID NOT NULL REFERENCES public.candidates(id) ON DELETE CASCADE,
+    overall_score INT DEFAULT 0,
+    strengths TEXT[] DEFAULT '{}',
+    weaknesses TEXT[] DEFAULT '{}',
+    missing_skills TEXT[] DEFAULT '{}',
+    keyword_optimization INT DEFAULT 0,
+    profile_completeness INT DEFAULT 0,
+    ai_summary TEXT,
+    industry_alignment TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS candidate_analysis_candidate_id_idx ON public.candidate_analysis(candidate_id);
+
+-- Written and read with the service role only: no policies, so anon/authenticated clients see nothing
+ALTER TABLE public.candidate_sources ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.candidates ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.candidate_analysis ENABLE ROW LEVEL SECURITY;
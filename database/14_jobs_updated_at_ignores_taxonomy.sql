@@ -0,0 +1,16 @@
+-- database/14_jobs_updated_at_ignores_taxonomy.sql
+-- Don't bump jobs.updated_at when an update only records the taxonomy version the row was
+-- checked against (backfill_extraction.py), so a taxonomy change does not invalidate every
+-- cached score and LLM response for jobs whose skills did not change
+
+CREATE OR REPLACE FUNCTION public.set_jobs_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (to_jsonb(NEW) - 'taxonomy_version' - 'updated_at') IS DISTINCT FROM (to_jsonb(OLD) - 'taxonomy_version' - 'updated_at') THEN
+        NEW.updated_at = NOW();
+    ELSE
+        NEW.updated_at = OLD.updated_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
@@ -56,6 +56,7 @@ export default function JobDetailPage() {
     const [showCover, setShowCover] = useState(false);
     const [error, setError] = useState('');
     const [aiFeedback, setAiFeedback] = useState<string[] | null>(null);
+    const [feedbackNote, setFeedbackNote] = useState('');
     const [buildingPlan, setBuildingPlan] = useState(false);
 
     useEffect(() => {
@@ -79,15 +80,40 @@ export default function JobDetailPage() {
         load();
     }, [id]);
 
+    // AI feedback is generated after the application is saved; poll until it is ready
+    const pollFeedback = async (applicationId: string) => {
+        for (let attempt = 0; attempt < 20; attempt++) {
+            await new Promise((resolve) => setTimeout(resolve, 1500));
+            try {
+                const feedback = await api.getApplicationFeedback(applicationId);
+                if (feedback.ai_feedback_status === 'failed') {
+                    setFeedbackNote('AI coach insights could not be generated for this application.');
+                    return;
+                }
+                if (feedback.ai_feedback_status !== 'pending') {
+                    setAiFeedback(feedback.ai_feedback);
+                    return;
+                }
+            } catch (err: unknown) {
+                console.error(err);
+                setFeedbackNote('AI coach insights are unavailable right now.');
+                return;
+            }
+        }
+        setFeedbackNote('AI coach insights are still being prepared. They will appear under Applications shortly.');
+    };
+
     const handleApply = async () => {
         setApplying(true);
         setError('');
         try {
             const res = await api.applyToJob(id, coverLetter || undefined, contactEmail || undefined, contactPhone || undefined);
-            if (res && (res as any).ai_feedback) {
+            setApplied(true);
+            if ((res as any)?.ai_feedback_status === 'pending' && (res as any).id) {
+                pollFeedback((res as any).id);
+            } else if (res && (res as any).ai_feedback) {
                 setAiFeedback((res as any).ai_feedback);
             }
-            setApplied(true);
         } catch (err: unknown) {
             setError(err instanceof Error ? err.message : 'Application failed');
         } finally {
@@ -377,6 +403,9 @@ export default function JobDetailPage() {
                                                 </button>
                                             </div>
                                         )}
+                                        {feedbackNote && (
+                                            <p className="text-xs text-slate-500 text-center">{feedbackNote}</p>
+                                        )}
                                     </div>
                                 ) : (
                                     <div className="space-y-4">
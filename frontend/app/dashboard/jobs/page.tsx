@@ -31,6 +31,9 @@ export default function JobsPage() {
     const [jobs, setJobs] = useState<Job[]>([]);
     const [feed, setFeed] = useState<{ highly_relevant: Job[]; based_on_skills: Job[]; trending: Job[] } | null>(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+    // How to fetch the next page: a ranking cursor, an offset, or null when there is none
+    const [nextPage, setNextPage] = useState<{ cursor?: string; offset?: number } | null>(null);
     const [search, setSearch] = useState('');
     const [industry, setIndustry] = useState('All Industries');
     const [jobType, setJobType] = useState('All Types');
@@ -44,20 +47,47 @@ export default function JobsPage() {
         } catch { /* no resume, fall to browse */ }
     };
 
+    const PAGE_SIZE = 20;
+
+    const jobParams = (q?: string) => {
+        const params: Record<string, string> = { limit: String(PAGE_SIZE) };
+        if (q) params.q = q;
+        if (industry !== 'All Industries') params.industry = industry;
+        if (jobType !== 'All Types') params.job_type = jobType;
+        return params;
+    };
+
+    const pageAfter = (data: { jobs: unknown[]; next_cursor: string | null }, loaded: number) => {
+        if (data.next_cursor) return { cursor: data.next_cursor };
+        return data.jobs.length === PAGE_SIZE ? { offset: loaded } : null;
+    };
+
     const loadJobs = async (q?: string) => {
         setLoading(true);
         try {
-            const params: Record<string, string> = {};
-            if (q) params.q = q;
-            if (industry !== 'All Industries') params.industry = industry;
-            if (jobType !== 'All Types') params.job_type = jobType;
-            const data = await api.getJobs(params);
+            const data = await api.getJobs(jobParams(q));
             setJobs(data.jobs as unknown as Job[]);
+            setNextPage(pageAfter(data, data.jobs.length));
         } finally {
             setLoading(false);
         }
     };
 
+    const loadMoreJobs = async () => {
+        if (!nextPage) return;
+        setLoadingMore(true);
+        try {
+            const params = jobParams(search);
+            if (nextPage.cursor) params.cursor = nextPage.cursor;
+            if (nextPage.offset) params.offset = String(nextPage.offset);
+            const data = await api.getJobs(params);
+            setJobs((current) => [...current, ...(data.jobs as unknown as Job[])]);
+            setNextPage(pageAfter(data, jobs.length + data.jobs.length));
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         loadFeed();
         loadJobs();
@@ -261,6 +291,11 @@ export default function JobsPage() {
                                             <JobCard {...mapToJobCardProps(job)} />
                                         </Link>
                                     ))}
+                                    {nextPage && (
+                                        <Button variant="outline" onClick={loadMoreJobs} disabled={loadingMore} className="mx-auto rounded-xl h-12 px-6 font-semibold border-slate-200 text-slate-600 hover:bg-white hover:text-slate-900 shadow-sm">
+                                            {loadingMore ? <Loader2 className="w-4 h-4 animate-spin" /> : 'Load more'}
+                                        </Button>
+                                    )}
                                 </div>
                             )
                             }
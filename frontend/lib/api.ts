@@ -160,9 +160,10 @@ class APIService {
     }
 
     // Jobs
-    async getJobs(params?: { q?: string; industry?: string; location?: string; job_type?: string; limit?: number; offset?: number }) {
+    async getJobs(params?: { q?: string; industry?: string; location?: string; job_type?: string; limit?: number; offset?: number; cursor?: string }) {
         const query = new URLSearchParams(params as Record<string, string>).toString();
-        return this.request<{ jobs: Record<string, unknown>[]; total: number }>(`/api/jobs${query ? `?${query}` : ''}`);
+        // next_cursor is set when the results are ranked for the user; otherwise page with offset
+        return this.request<{ jobs: Record<string, unknown>[]; total: number; next_cursor: string | null }>(`/api/jobs${query ? `?${query}` : ''}`);
     }
 
     async getJob(id: string) {
@@ -181,6 +182,10 @@ class APIService {
         return this.createJob(data);
     }
 
+    async updateJob(id: string, data: Record<string, unknown>) {
+        return this.request(`/api/jobs/${id}`, { method: 'PATCH', body: JSON.stringify(data) });
+    }
+
     async getFeed() {
         return this.request<{ highly_relevant: Record<string, unknown>[]; based_on_skills: Record<string, unknown>[]; trending: Record<string, unknown>[] }>('/api/jobs/feed');
     }
@@ -198,6 +203,10 @@ class APIService {
         });
     }
 
+    async getApplicationFeedback(applicationId: string) {
+        return this.request<{ id: string; ai_feedback_status: 'pending' | 'ready' | 'failed'; ai_feedback: string[] }>(`/api/applications/${applicationId}/feedback`);
+    }
+
     async getApplications() {
         return this.request<{ applications: Record<string, unknown>[] }>('/api/applications');
     }